@@ -4,13 +4,17 @@ Configuration from environment variables (12-factor).
 import os
 from pathlib import Path
 
-from dotenv import load_dotenv
 from functools import lru_cache
 from urllib.parse import urlparse, parse_qs, unquote
 
-# Load .env from repo root when present (local dev). In containers/Cloud Run there is no .env.
+# Load .env from repo root when present (local dev). In containers/Cloud Run there is no .env,
+# so python-dotenv is only imported when the file exists.
 try:
-    load_dotenv(Path(__file__).resolve().parents[3] / ".env")
+    _env_file = Path(__file__).resolve().parents[3] / ".env"
+    if _env_file.is_file():
+        from dotenv import load_dotenv
+
+        load_dotenv(_env_file)
 except Exception:
     # Avoid crashing in minimal container layouts.
     pass
@@ -80,3 +84,131 @@ def get_database_connect_kwargs() -> dict:
 
     # Remove Nones
     return {k: v for k, v in kwargs.items() if v is not None}
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Parse a boolean env var (1/true/yes/on)."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+@lru_cache
+def get_catalog_cache_enabled() -> bool:
+    """Serve read endpoints from the in-memory catalog snapshot (CATALOG_CACHE, default on; forced by CATALOG_SNAPSHOT_ONLY)."""
+    return _env_flag("CATALOG_CACHE", True) or get_catalog_snapshot_only()
+
+
+@lru_cache
+def get_catalog_snapshot_path() -> str:
+    """Catalog snapshot file (CATALOG_SNAPSHOT_PATH; empty = none).
+
+    The scrape job writes it after each run; the API boots its in-memory
+    catalog from it when present.
+    """
+    return os.getenv("CATALOG_SNAPSHOT_PATH", "").strip()
+
+
+@lru_cache
+def get_catalog_snapshot_only() -> bool:
+    """Serve the catalog from CATALOG_SNAPSHOT_PATH alone, with no database (CATALOG_SNAPSHOT_ONLY, default off).
+
+    The file is re-checked every CATALOG_REFRESH_SECONDS; endpoints that need
+    Postgres (history, export) answer 503.
+    """
+    return _env_flag("CATALOG_SNAPSHOT_ONLY", False) and bool(get_catalog_snapshot_path())
+
+
+@lru_cache
+def get_catalog_refresh_seconds() -> float:
+    """Minimum seconds between catalog version checks (CATALOG_REFRESH_SECONDS, default 30)."""
+    return float(os.getenv("CATALOG_REFRESH_SECONDS", "30"))
+
+
+@lru_cache
+def get_catalog_listen_enabled() -> bool:
+    """Keep the catalog current via LISTEN/NOTIFY plus a background version check (CATALOG_LISTEN, default on).
+
+    Disable behind poolers that don't support LISTEN (e.g. PgBouncer transaction mode);
+    the request path then checks the version every CATALOG_REFRESH_SECONDS.
+    """
+    return _env_flag("CATALOG_LISTEN", True)
+
+
+@lru_cache
+def get_pool_settings() -> dict:
+    """asyncpg pool sizing, timeouts and statement-cache settings (DATABASE_POOL_* / DATABASE_*).
+
+    Passed straight to asyncpg.create_pool; defaults match the previous
+    hard-coded pool plus asyncpg's own statement-cache defaults.
+    """
+    return {
+        "min_size": int(os.getenv("DATABASE_POOL_MIN_SIZE", "1")),
+        "max_size": int(os.getenv("DATABASE_POOL_MAX_SIZE", "10")),
+        "command_timeout": float(os.getenv("DATABASE_COMMAND_TIMEOUT", "60")),
+        # Close connections idle this long (seconds; 0 = never); keeps min_size warm.
+        "max_inactive_connection_lifetime": float(os.getenv("DATABASE_POOL_MAX_IDLE_SECONDS", "300")),
+        # Prepared statements cached per connection (0 disables, e.g. behind PgBouncer transaction mode).
+        "statement_cache_size": int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "100")),
+        "max_cached_statement_lifetime": int(os.getenv("DATABASE_STATEMENT_CACHE_LIFETIME_SECONDS", "300")),
+        "max_cacheable_statement_size": int(os.getenv("DATABASE_STATEMENT_CACHE_MAX_BYTES", str(15 * 1024))),
+    }
+
+
+@lru_cache
+def get_metrics_settings() -> dict:
+    """Cross-worker metrics (METRICS_MULTIPROC_DIR, empty = per process; see app.metrics)."""
+    return {
+        "multiproc_dir": os.getenv("METRICS_MULTIPROC_DIR", "").strip(),
+        "flush_seconds": float(os.getenv("METRICS_FLUSH_SECONDS", "1")),
+    }
+
+
+@lru_cache
+def get_internal_token() -> str:
+    """Bearer token for /internal/* endpoints (INTERNAL_TOKEN); empty disables them (404)."""
+    return os.getenv("INTERNAL_TOKEN", "").strip()
+
+
+@lru_cache
+def get_export_concurrency() -> int:
+    """Exports streaming at once per process (EXPORT_MAX_CONCURRENCY, default a quarter of the pool).
+
+    Each export holds a pooled connection for the whole download, so slow
+    clients must not be able to take every connection from catalog reads.
+    """
+    default = max(1, get_pool_settings()["max_size"] // 4)
+    return max(1, int(os.getenv("EXPORT_MAX_CONCURRENCY", str(default))))
+
+
+@lru_cache
+def get_rate_limit_settings() -> dict:
+    """Rate limiter settings (RATE_LIMIT, RATE_LIMIT_*; see app.limiter).
+
+    `rate` is e.g. "100/minute" (empty disables). `backend` is memory
+    (per process), postgres or redis (shared across the fleet).
+    """
+    return {
+        "rate": os.getenv("RATE_LIMIT", "100/minute").strip(),
+        "backend": os.getenv("RATE_LIMIT_BACKEND", "memory").strip().lower() or "memory",
+        "redis_url": os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0").strip(),
+        # Seconds between pushes of local hit counts to the shared backend
+        "sync_seconds": float(os.getenv("RATE_LIMIT_SYNC_SECONDS", "1")),
+        # Proxies in front of the API that append to X-Forwarded-For (Cloud Run: 1)
+        "trusted_hops": int(os.getenv("RATE_LIMIT_TRUSTED_HOPS", "0")),
+    }
+
+
+@lru_cache
+def get_warmup_paths() -> list[str]:
+    """API paths requested in-process during startup warm-up (STARTUP_WARM_PATHS, comma-separated).
+
+    Primes the response cache (and its compressed variants) plus lazily built
+    indexes, so the first real requests are served from memory. Empty disables.
+    """
+    raw = os.getenv(
+        "STARTUP_WARM_PATHS",
+        "/api/providers,/api/models,/api/search?q=gpt,/api/estimate?input_tokens=1000000&output_tokens=1000000",
+    )
+    return [p.strip() for p in raw.split(",") if p.strip()]
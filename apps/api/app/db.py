@@ -1,30 +1,234 @@
 """
 Database connection pool — asyncpg.
-Uses DATABASE_URL from environment.
+Uses DATABASE_URL from environment; pool sizing and statement cache via
+get_pool_settings().
+
+Queries acquire connections through `acquire()`, which records how long each
+caller waited for a free connection (see PoolStats / GET /internal/pool).
+
+Also owns the dedicated LISTEN connection (outside the pool) used to hear
+catalog-version notifications from the scrape job.
 """
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
 import asyncpg
-from app.config import get_database_connect_kwargs
+from app.config import get_catalog_snapshot_only, get_database_connect_kwargs, get_pool_settings
+from app.metrics import db_pool_acquire_wait, db_query_duration, db_query_rows
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel the scrape/seed jobs signal after publishing new catalog data
+CATALOG_VERSION_CHANNEL = "catalog_version"
 
 _pool: asyncpg.Pool | None = None
+_pool_lock = asyncio.Lock()
+
+
+class PoolStats:
+    """Acquire-wait accounting for the pool (process-local, since start)."""
+
+    # Upper bounds (seconds) of the wait-time histogram buckets
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self) -> None:
+        self.acquires = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.bucket_counts = [0] * (len(self.BUCKETS) + 1)  # last = above the largest bound
+        self.timeouts = 0
+
+    def record_wait(self, seconds: float) -> None:
+        self.acquires += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                return
+        self.bucket_counts[-1] += 1
+
+
+pool_stats = PoolStats()
+
+
+class DatabaseDisabled(RuntimeError):
+    """Raised instead of connecting when the API runs from a snapshot file only (503)."""
 
 
 async def get_pool() -> asyncpg.Pool:
     """Get or create connection pool."""
     global _pool
     if _pool is None:
-        connect_kwargs = get_database_connect_kwargs()
-        _pool = await asyncpg.create_pool(
-            **connect_kwargs,
-            min_size=1,
-            max_size=10,
-            command_timeout=60,
-        )
+        if get_catalog_snapshot_only():
+            raise DatabaseDisabled("Database access is disabled (CATALOG_SNAPSHOT_ONLY)")
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await asyncpg.create_pool(**get_database_connect_kwargs(), **get_pool_settings())
     return _pool
 
 
+@asynccontextmanager
+async def acquire() -> AsyncIterator[asyncpg.Connection]:
+    """Acquire a pooled connection, recording the wait in pool_stats."""
+    pool = await get_pool()
+    started = time.perf_counter()
+    try:
+        conn = await pool.acquire()
+    except asyncio.TimeoutError:
+        pool_stats.timeouts += 1
+        raise
+    waited = time.perf_counter() - started
+    pool_stats.record_wait(waited)
+    db_pool_acquire_wait.observe((), waited)
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+async def fetch(conn: asyncpg.Connection, name: str, query: str, *args) -> list[asyncpg.Record]:
+    """conn.fetch, timed and row-counted under the metric label `name`."""
+    started = time.perf_counter()
+    rows = await conn.fetch(query, *args)
+    db_query_duration.observe((name,), time.perf_counter() - started)
+    db_query_rows.inc((name,), len(rows))
+    return rows
+
+
+async def fetchrow(conn: asyncpg.Connection, name: str, query: str, *args) -> asyncpg.Record | None:
+    """conn.fetchrow, timed and row-counted under the metric label `name`."""
+    started = time.perf_counter()
+    row = await conn.fetchrow(query, *args)
+    db_query_duration.observe((name,), time.perf_counter() - started)
+    db_query_rows.inc((name,), 0 if row is None else 1)
+    return row
+
+
+async def warm_pool() -> None:
+    """Create the pool and open min_size connections up front (run from lifespan).
+
+    asyncpg opens min_size connections in create_pool; each is then checked
+    with a round trip so the first requests after a cold start skip connect
+    and auth entirely.
+    """
+    pool = await get_pool()
+    size = pool.get_min_size()
+    conns = []
+    try:
+        # Acquired inside the try: if one acquire fails, the ones already held are released.
+        for _ in range(size):
+            conns.append(await pool.acquire())
+        await asyncio.gather(*(conn.execute("SELECT 1") for conn in conns))
+    finally:
+        for conn in conns:
+            await pool.release(conn)
+
+
+def pool_status() -> dict:
+    """Pool sizing, in-use/idle counts and acquire-wait stats."""
+    stats = {
+        "acquires": pool_stats.acquires,
+        "acquireTimeouts": pool_stats.timeouts,
+        "waitSecondsTotal": round(pool_stats.wait_seconds_total, 6),
+        "waitSecondsMax": round(pool_stats.wait_seconds_max, 6),
+        "waitSecondsAvg": round(pool_stats.wait_seconds_total / pool_stats.acquires, 6) if pool_stats.acquires else 0.0,
+        "waitBuckets": {
+            **{f"le_{bound:g}": count for bound, count in zip(PoolStats.BUCKETS, pool_stats.bucket_counts)},
+            "gt_max": pool_stats.bucket_counts[-1],
+        },
+    }
+    if _pool is None:
+        return {"initialized": False, **stats}
+    size = _pool.get_size()
+    idle = _pool.get_idle_size()
+    return {
+        "initialized": True,
+        "minSize": _pool.get_min_size(),
+        "maxSize": _pool.get_max_size(),
+        "size": size,
+        "inUse": size - idle,
+        "idle": idle,
+        **stats,
+    }
+
+
 async def close_pool() -> None:
     """Close pool on shutdown."""
     global _pool
     if _pool:
         await _pool.close()
         _pool = None
+
+
+class Listener:
+    """LISTEN on a channel over one dedicated connection, reconnecting when it drops.
+
+    `on_notify(payload)` runs on every notification; `on_connect()` runs after
+    each (re)connect, since notifications sent while disconnected are lost.
+    """
+
+    # Seconds between liveness pings on an idle listener connection
+    PING_SECONDS = 60.0
+    MAX_BACKOFF_SECONDS = 30.0
+
+    def __init__(
+        self,
+        channel: str,
+        on_notify: Callable[[str], None],
+        on_connect: Callable[[], None] | None = None,
+    ) -> None:
+        self.channel = channel
+        self.on_notify = on_notify
+        self.on_connect = on_connect
+        self.connected = False
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _notified(self, conn, pid, channel, payload) -> None:
+        self.on_notify(payload)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(**get_database_connect_kwargs())
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda c: lost.set())
+                await conn.add_listener(self.channel, self._notified)
+                self.connected = True
+                backoff = 1.0
+                if self.on_connect:
+                    self.on_connect()
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), self.PING_SECONDS)
+                    except asyncio.TimeoutError:
+                        # Detect silently dropped connections (e.g. idle TCP reaped by a proxy).
+                        await conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("LISTEN %s connection failed: %s", self.channel, e)
+            finally:
+                self.connected = False
+                if conn is not None and not conn.is_closed():
+                    conn.terminate()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.MAX_BACKOFF_SECONDS)
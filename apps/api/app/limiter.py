@@ -1,16 +1,371 @@
 """
-Rate limiter — SlowAPI. Configurable via RATE_LIMIT env (e.g. 100/minute).
+Rate limiter — per-client token buckets checked in process. Configured via
+RATE_LIMIT (e.g. 100/minute; empty disables) and RATE_LIMIT_* env vars.
+
+Each client gets a bucket of RATE_LIMIT requests, refilled evenly over the
+period, so a decision is a dict lookup and some arithmetic — no I/O on the
+request path. With a shared backend (RATE_LIMIT_BACKEND=postgres or redis)
+a background task pushes each process's hit counts every
+RATE_LIMIT_SYNC_SECONDS in one round trip, gets back fleet-wide totals for
+the current period and drains local buckets by what other workers and
+replicas used meanwhile. The limit then holds across the fleet, overshooting
+by at most one sync interval of traffic.
+
+Clients are keyed by IP: the socket peer, or with RATE_LIMIT_TRUSTED_HOPS=N
+the Nth X-Forwarded-For entry from the right (the address the outermost
+trusted proxy saw). Entries further left are client-supplied and ignored.
+
+Routes decorated with `@limiter.exempt` are never limited.
 """
-import os
+import asyncio
+import logging
+import math
+import time
+from typing import Callable
+from urllib.parse import unquote, urlparse
+
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import get_rate_limit_settings
+from app.metrics import WARMUP_SCOPE_KEY
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+_PERIOD_NAMES = {v: k for k, v in _PERIODS.items()}
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """'100/minute' -> (100, 60.0). Periods: second, minute, hour, day."""
+    count, _, period = rate.partition("/")
+    period = period.strip().lower().removesuffix("s")
+    if not count.strip().isdigit() or period not in _PERIODS:
+        raise ValueError(f"Invalid rate limit {rate!r} (expected e.g. 100/minute)")
+    return int(count), _PERIODS[period]
+
+
+def client_address(scope: Scope, trusted_hops: int = 0) -> str:
+    """Client IP for rate limiting: the trusted X-Forwarded-For hop, else the socket peer."""
+    if trusted_hops > 0:
+        forwarded = [
+            value.decode("latin-1") for name, value in scope["headers"] if name == b"x-forwarded-for"
+        ]
+        if forwarded:
+            hops = [hop.strip() for hop in ",".join(forwarded).split(",")]
+            if len(hops) >= trusted_hops and hops[-trusted_hops]:
+                return hops[-trusted_hops]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "pending", "own", "peers")
+
+    def __init__(self, tokens: float, now: float) -> None:
+        self.tokens = tokens
+        self.updated = now
+        self.pending = 0  # hits not yet pushed to the shared backend
+        self.own = 0  # hits pushed in the current window
+        self.peers = 0  # other processes' hits seen in the current window
+
+
+class RateLimiter:
+    """Token buckets per client key, optionally synced through a shared backend."""
+
+    def __init__(
+        self,
+        rate: str,
+        backend: "PostgresBackend | RedisBackend | None" = None,
+        sync_seconds: float = 1.0,
+        trusted_hops: int = 0,
+    ) -> None:
+        self.enabled = bool(rate)
+        self.limit, self.period = parse_rate(rate) if rate else (0, 1.0)
+        self.refill_per_second = self.limit / self.period
+        self.backend = backend
+        self.sync_seconds = sync_seconds
+        self.trusted_hops = trusted_hops
+        self.exempt_endpoints: set[Callable] = set()
+        self._buckets: dict[str, _Bucket] = {}
+        self._window: int | None = None
+        self._pruned_at = time.monotonic()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def description(self) -> str:
+        return f"{self.limit} per 1 {_PERIOD_NAMES.get(self.period, f'{self.period:g}s')}"
+
+    def exempt(self, func: Callable) -> Callable:
+        """Route decorator: never rate limit this endpoint."""
+        self.exempt_endpoints.add(func)
+        return func
+
+    def hit(self, key: str, now: float | None = None) -> float:
+        """Take a token for `key`: 0.0 if allowed, else seconds until one is available."""
+        if now is None:
+            now = time.monotonic()
+        if self.backend is None and now - self._pruned_at > self.period:
+            # Before the lookup: pruning may drop this key's (refilled) bucket.
+            self._prune(now)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(float(self.limit), now)
+        else:
+            bucket.tokens = min(self.limit, bucket.tokens + (now - bucket.updated) * self.refill_per_second)
+            bucket.updated = now
+        if bucket.tokens < 1:
+            return (1 - bucket.tokens) / self.refill_per_second
+        bucket.tokens -= 1
+        if self.backend is not None:
+            bucket.pending += 1
+        return 0.0
+
+    def _prune(self, now: float) -> None:
+        """Drop buckets that have refilled completely and have nothing left to sync."""
+        self._pruned_at = now
+        for key, bucket in list(self._buckets.items()):
+            if bucket.pending == 0 and bucket.tokens + (now - bucket.updated) * self.refill_per_second >= self.limit:
+                del self._buckets[key]
+
+    async def sync(self) -> None:
+        """Push pending hits to the shared backend and drain buckets by other processes' hits."""
+        window = int(time.time() // self.period)
+        if window != self._window:
+            self._window = window
+            for bucket in self._buckets.values():
+                bucket.own = bucket.peers = 0
+        self._prune(time.monotonic())
+        if not self._buckets:
+            return
+        # Every live bucket is included (delta 0 if idle here): peers may be using the same key.
+        deltas = {key: bucket.pending for key, bucket in self._buckets.items()}
+        for bucket in self._buckets.values():
+            bucket.own += bucket.pending
+            bucket.pending = 0
+        try:
+            totals = await self.backend.push(window, deltas, ttl=int(self.period * 2) + 1)
+        except BaseException:
+            # Keep the counts for the next attempt.
+            for key, delta in deltas.items():
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.own -= delta
+                    bucket.pending += delta
+            raise
+        for key, total in totals.items():
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            peers = total - bucket.own
+            if peers > bucket.peers:
+                bucket.tokens = max(0.0, bucket.tokens - (peers - bucket.peers))
+                bucket.peers = peers
+
+    def start(self) -> None:
+        """Start the background sync loop (shared backends only)."""
+        if self.enabled and self.backend is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await self.sync()
+        except Exception as e:
+            logger.warning("Final rate limit sync failed: %s", e)
+        await self.backend.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_seconds)
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Rate limit sync (%s) failed: %s", type(self.backend).__name__, e)
+
+
+class PostgresBackend:
+    """Fleet-wide counters in `rate_limit_counters` (migration 008), one upsert per sync."""
+
+    PUSH_SQL = """
+        INSERT INTO rate_limit_counters (key, window_id, hits)
+        SELECT key, $2, hits FROM unnest($1::text[], $3::bigint[]) AS t(key, hits)
+        ON CONFLICT (key, window_id) DO UPDATE SET hits = rate_limit_counters.hits + EXCLUDED.hits
+        RETURNING key, hits
+    """
+    EXPIRE_SQL = "DELETE FROM rate_limit_counters WHERE window_id < $1"
+
+    def __init__(self) -> None:
+        self._expired_before: int | None = None
+
+    async def push(self, window: int, deltas: dict[str, int], ttl: int) -> dict[str, int]:
+        from app.db import acquire, fetch
+
+        # Sorted so concurrent upserts from several processes lock rows in the same order.
+        keys = sorted(deltas)
+        async with acquire() as conn:
+            rows = await fetch(conn, "rate_limit_sync", self.PUSH_SQL, keys, window, [deltas[k] for k in keys])
+            if self._expired_before != window:
+                await conn.execute(self.EXPIRE_SQL, window - 1)
+                self._expired_before = window
+        return {r["key"]: r["hits"] for r in rows}
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisBackend:
+    """Fleet-wide counters in a Redis-compatible server: pipelined INCRBY + EXPIRE per sync.
+
+    Speaks RESP directly over one connection (no client library), like the
+    in-house metrics registry. URL: redis://[[user]:password@]host[:port][/db].
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit") -> None:
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    async def _reply(self):
+        line = await self._reader.readuntil(b"\r\n")
+        kind, body = line[:1], line[1:-2]
+        if kind == b":":
+            return int(body)
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RuntimeError(f"Redis error: {body.decode()}")
+        if kind == b"$":
+            size = int(body)
+            return None if size < 0 else (await self._reader.readexactly(size + 2))[:-2]
+        if kind == b"*":
+            return [await self._reply() for _ in range(max(0, int(body)))]
+        raise RuntimeError(f"Unexpected Redis reply: {line!r}")
+
+    async def _execute(self, commands: list[tuple]) -> list:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            setup = []
+            if self.password:
+                setup.append(("AUTH", self.username, self.password) if self.username else ("AUTH", self.password))
+            if self.db:
+                setup.append(("SELECT", self.db))
+            commands = setup + commands
+            skip = len(setup)
+        else:
+            skip = 0
+        try:
+            self._writer.write(b"".join(self._encode(*c) for c in commands))
+            await self._writer.drain()
+            replies = [await self._reply() for _ in commands]
+        except BaseException:
+            await self.close()  # the stream may be mid-reply; reconnect next time
+            raise
+        return replies[skip:]
+
+    async def push(self, window: int, deltas: dict[str, int], ttl: int) -> dict[str, int]:
+        keys = list(deltas)
+        commands = []
+        for key in keys:
+            name = f"{self.prefix}:{window}:{key}"
+            commands.append(("INCRBY", name, deltas[key]))
+            commands.append(("EXPIRE", name, ttl))
+        replies = await self._execute(commands)
+        return {key: replies[2 * i] for i, key in enumerate(keys)}
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware: 429 with Retry-After once a client's bucket is empty."""
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter) -> None:
+        self.app = app
+        self.limiter = limiter
+        self._exempt_paths: set[str] | None = None
+        self._exempt_routes: list = []
+
+    def _is_exempt(self, scope: Scope) -> bool:
+        if self._exempt_paths is None:
+            # Resolved once from the app's routes (static paths are a set lookup).
+            paths, routes = set(), []
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) in self.limiter.exempt_endpoints:
+                    if "{" in route.path:
+                        routes.append(route)
+                    else:
+                        paths.add(route.path)
+            self._exempt_routes = routes
+            self._exempt_paths = paths
+        if scope["path"] in self._exempt_paths:
+            return True
+        return any(route.matches(scope)[0] == Match.FULL for route in self._exempt_routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.limiter.enabled
+            or scope.get(WARMUP_SCOPE_KEY)
+            or self._is_exempt(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+        retry_after = self.limiter.hit(client_address(scope, self.limiter.trusted_hops))
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+        response = JSONResponse(
+            {"error": f"Rate limit exceeded: {self.limiter.description}"},
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+        await response(scope, receive, send)
+
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+def _build_limiter() -> RateLimiter:
+    settings = get_rate_limit_settings()
+    name = settings["backend"]
+    if name not in ("memory", "postgres", "redis"):
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND {name!r} (memory, postgres or redis)")
+    backend = None
+    if settings["rate"] and name == "postgres":
+        backend = PostgresBackend()
+    elif settings["rate"] and name == "redis":
+        backend = RedisBackend(settings["redis_url"])
+    return RateLimiter(
+        settings["rate"],
+        backend=backend,
+        sync_seconds=settings["sync_seconds"],
+        trusted_hops=settings["trusted_hops"],
+    )
 
-_rate_limit = os.getenv("RATE_LIMIT", "100/minute").strip()
-_default_limits = [_rate_limit] if _rate_limit else []
 
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=_default_limits,
-    enabled=bool(_rate_limit),
-)
+limiter = _build_limiter()
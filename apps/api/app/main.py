@@ -2,26 +2,50 @@
 AI Models Stats API — FastAPI application.
 Config via environment variables (12-factor).
 """
+import asyncio
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
-
-from app.db import close_pool
-from app.limiter import limiter
-from app.routers import models, providers, compare, health
+from app.config import (
+    get_catalog_cache_enabled,
+    get_catalog_listen_enabled,
+    get_catalog_refresh_seconds,
+    get_catalog_snapshot_only,
+)
+from app.db import DatabaseDisabled, close_pool
+from app.limiter import RateLimitMiddleware, limiter
+from app.metrics import MetricsMiddleware, multiprocess as metrics_store
+from app.routers import models, providers, compare, health, history, estimate, search, export, internal, metrics
+from app.services.db_service import CatalogWatcher
+from app.startup import warm_up
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Pool, catalog and hot responses warm in the background; /health reports 503 until done.
+    warmup = asyncio.create_task(warm_up(app))
+    limiter.start()
+    metrics_store.start()
+    watcher = None
+    if get_catalog_cache_enabled() and get_catalog_listen_enabled() and not get_catalog_snapshot_only():
+        # Snapshot follows scrape-job NOTIFYs (version check every CATALOG_REFRESH_SECONDS as fallback).
+        watcher = CatalogWatcher(get_catalog_refresh_seconds())
+        watcher.start()
     yield
+    # Wait for warm-up to unwind before closing what it may still be using (pool, catalog load).
+    warmup.cancel()
+    with suppress(asyncio.CancelledError):
+        await warmup
+    if watcher is not None:
+        await watcher.stop()
+    await limiter.stop()
+    await metrics_store.stop()
     await close_pool()
 
 
@@ -32,10 +56,14 @@ app = FastAPI(
     version="0.1.0",
 )
 
+# Snapshot-only mode (CATALOG_SNAPSHOT_ONLY): endpoints that need Postgres are unavailable.
+@app.exception_handler(DatabaseDisabled)
+async def database_disabled_handler(request: Request, exc: DatabaseDisabled):
+    return JSONResponse({"detail": str(exc)}, status_code=503)
+
+
 # Rate limiting — configurable via RATE_LIMIT env (e.g. 100/minute). Empty = disabled.
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(RateLimitMiddleware, limiter=limiter)
 
 # Security headers middleware
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
@@ -57,9 +85,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# Outermost, so latency covers rate limiting, CORS and security headers too.
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(health.router, tags=["health"])
+app.include_router(internal.router)
+app.include_router(metrics.router)
 app.include_router(providers.router, prefix="/api", tags=["providers"])
 app.include_router(models.router, prefix="/api", tags=["models"])
 app.include_router(compare.router, prefix="/api", tags=["compare"])
+app.include_router(history.router, prefix="/api", tags=["history"])
+app.include_router(estimate.router, prefix="/api", tags=["estimate"])
+app.include_router(search.router, prefix="/api", tags=["search"])
+app.include_router(export.router, prefix="/api", tags=["export"])
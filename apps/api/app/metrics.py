@@ -0,0 +1,328 @@
+"""
+Metrics in Prometheus text format (served at GET /metrics).
+
+Minimal counters and histograms (no client library): label values are
+tuples, and an observation is a dict lookup, a bisect and a few additions.
+
+State is per process. With several workers per container, set
+METRICS_MULTIPROC_DIR (a directory shared by the workers, emptied at
+container start): every worker writes its series there each
+METRICS_FLUSH_SECONDS, and whichever worker serves /metrics adds them up,
+so counters and histograms cover the whole container. Gauges describe one
+process and get a `pid` label instead.
+
+Recorded:
+- http_request_duration_seconds{method,route,status} — MetricsMiddleware
+- db_query_duration_seconds{query} / db_query_rows_total{query} — app.db.fetch*
+- db_pool_acquire_wait_seconds — app.db.acquire
+- response_serialize_seconds{kind} and response_cache_requests_total{kind,result}
+- response_compress_seconds{kind,encoding} — once per cached body and encoding
+- export_stream_seconds{dataset,format} / export_rows_total{dataset} — whole export streams
+- DB pool and catalog snapshot gauges, collected at scrape time
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_metrics_settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ASGI scope flag on in-process warm-up requests (app.startup): they are not real traffic, so
+# request metrics and the rate limiter skip them. Clients can't set scope keys, unlike headers.
+WARMUP_SCOPE_KEY = "app.warmup"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, labels: tuple[str, ...] = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def dump(self) -> list:
+        return [[list(labels), value] for labels, value in self.values.items()]
+
+    def render(self, others: list[dict] = ()) -> Iterable[str]:
+        values = dict(self.values)
+        for other in others:
+            for labels, value in other.get(self.name, ()):
+                labels = tuple(labels)
+                values[labels] = values.get(labels, 0.0) + value
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self.values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def dump(self) -> list:
+        return [[list(labels), series] for labels, series in self.values.items()]
+
+    def render(self, others: list[dict] = ()) -> Iterable[str]:
+        values = {labels: list(series) for labels, series in self.values.items()}
+        for other in others:
+            for labels, series in other.get(self.name, ()):
+                labels = tuple(labels)
+                if labels not in values:
+                    values[labels] = list(series)
+                elif len(series) == len(values[labels]):
+                    values[labels] = [a + b for a, b in zip(values[labels], series)]
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        bounds = [f'le="{bound:g}"' for bound in self.buckets] + ['le="+Inf"']
+        for labels, series in values.items():
+            cumulative = 0
+            for le, count in zip(bounds, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]!r}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauges:
+    """Gauges computed on demand: `collect()` returns {name: value} when /metrics is scraped."""
+
+    def __init__(self, help: dict[str, str], collect: Callable[[], dict[str, float]], name: str = "gauges") -> None:
+        self.help = help
+        self.collect = collect
+        # Key of this collector in multi-process dumps
+        self.name = name
+
+    def dump(self) -> dict[str, float]:
+        return self.collect()
+
+    def render(self, others: list[dict] = ()) -> Iterable[str]:
+        # Multi-process: one series per live worker (pid label); values are not additive.
+        per_process = [(str(os.getpid()) if multiprocess.enabled else None, self.collect())]
+        per_process += [(str(o["pid"]), o.get(self.name, {})) for o in others if o.get("live")]
+        for name, help_text in self.help.items():
+            samples = [(pid, values[name]) for pid, values in per_process if name in values]
+            if not samples:
+                continue
+            yield f"# HELP {name} {help_text}"
+            yield f"# TYPE {name} gauge"
+            for pid, value in samples:
+                yield f"{name}{_labels(('pid',), (pid,)) if pid else ''} {_number(value)}"
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+db_query_duration = Histogram("db_query_duration_seconds", "Database query latency", ("query",))
+db_query_rows = Counter("db_query_rows_total", "Rows returned by database queries", ("query",))
+db_pool_acquire_wait = Histogram("db_pool_acquire_wait_seconds", "Time waiting for a pooled connection")
+serialize_duration = Histogram(
+    "response_serialize_seconds",
+    "JSON encoding time of cached response bodies",
+    ("kind",),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+compress_duration = Histogram(
+    "response_compress_seconds",
+    "Compression time of cached response bodies (once per body and encoding)",
+    ("kind", "encoding"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+response_cache_requests = Counter(
+    "response_cache_requests_total",
+    "Cached JSON responses by outcome (hit, miss, uncached)",
+    ("kind", "result"),
+)
+export_stream_duration = Histogram(
+    "export_stream_seconds",
+    "Bulk export duration, first row to last chunk (includes time waiting on the client)",
+    ("dataset", "format"),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+export_rows = Counter("export_rows_total", "Rows streamed by bulk exports", ("dataset",))
+
+REGISTRY: list = [
+    http_request_duration,
+    db_query_duration,
+    db_query_rows,
+    db_pool_acquire_wait,
+    serialize_duration,
+    compress_duration,
+    response_cache_requests,
+    export_stream_duration,
+    export_rows,
+]
+
+
+def register(collector) -> None:
+    REGISTRY.append(collector)
+
+
+class MultiprocessStore:
+    """Shares this worker's series with the other workers through files in `directory`.
+
+    Each process writes <pid>-<start time>.json (atomically) every `interval`
+    seconds and on shutdown. Files of exited workers stay, so container-wide
+    counters never go backwards; their gauges are dropped once the file is
+    older than a few intervals.
+    """
+
+    def __init__(self, directory: str, interval: float) -> None:
+        self.directory = Path(directory) if directory else None
+        self.interval = interval
+        self.path: Path | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"{os.getpid()}-{time.time_ns()}.json"
+        self.write()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.write(final=True)
+
+    def write(self, final: bool = False) -> None:
+        data: dict[str, Any] = {"pid": os.getpid(), "written": time.time(), "final": final}
+        for collector in REGISTRY:
+            # A stopped worker's gauges (pool, catalog) no longer describe anything.
+            if not (final and isinstance(collector, Gauges)):
+                data[collector.name] = collector.dump()
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, self.path)
+
+    def others(self) -> list[dict]:
+        """Latest dumps of every other worker (live ones flagged `live`)."""
+        if not self.enabled:
+            return []
+        out = []
+        stale_before = time.time() - 3 * self.interval
+        for path in self.directory.glob("*.json"):
+            if path == self.path:
+                continue
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue  # mid-replace or unreadable: skip this scrape
+            data["live"] = not data.get("final") and data.get("written", 0) >= stale_before
+            out.append(data)
+        return out
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning("Writing metrics to %s failed: %s", self.path, e)
+
+
+_settings = get_metrics_settings()
+multiprocess = MultiprocessStore(_settings["multiproc_dir"], _settings["flush_seconds"])
+
+
+def render() -> str:
+    others = multiprocess.others()
+    lines: list[str] = []
+    for collector in REGISTRY:
+        lines.extend(collector.render(others))
+    return "\n".join(lines) + "\n"
+
+
+# Request methods with their own series; anything else a client sends is recorded as "other".
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request (per route template, not raw path)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get(WARMUP_SCOPE_KEY):
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # Unmatched paths and unknown methods share one series so clients can't blow up cardinality.
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+            http_request_duration.observe(
+                (method, template, str(status)),
+                time.perf_counter() - started,
+            )
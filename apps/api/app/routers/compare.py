@@ -1,16 +1,21 @@
 """Compare models API."""
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
 
 from app.services.db_service import get_models_by_ids
+from app.services.response_cache import cached_json
 
 router = APIRouter()
 
 
 @router.get("/compare")
 async def compare_models(
+    request: Request,
     ids: str = Query(..., description="Comma-separated model ids (e.g. id1,id2,id3)"),
 ):
     """Compare multiple models side by side."""
     model_ids = [i.strip() for i in ids.split(",") if i.strip()][:10]
-    models = await get_models_by_ids(model_ids)
-    return {"models": models}
+
+    async def build(catalog):
+        return {"models": await get_models_by_ids(model_ids, catalog)}
+
+    return await cached_json(request, ("compare", tuple(model_ids)), build)
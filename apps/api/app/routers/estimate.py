@@ -0,0 +1,50 @@
+"""Workload cost estimation API."""
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.services.db_service import get_catalog
+from app.services.estimate_service import Workload, estimate_costs
+from app.services.response_cache import cached_json
+
+router = APIRouter()
+
+
+@router.get("/estimate")
+async def estimate(
+    request: Request,
+    input_tokens: int = Query(0, ge=0, description="Input tokens"),
+    output_tokens: int = Query(0, ge=0, description="Output tokens"),
+    cached_ratio: float = Query(0.0, ge=0.0, le=1.0, description="Share of input tokens served from cache (0-1)"),
+    batch: bool = Query(False, description="Use Batch API prices where available"),
+    images: int = Query(0, ge=0, description="Generated images"),
+    video_seconds: float = Query(0.0, ge=0.0, description="Generated video seconds"),
+    provider: str | None = Query(None, description="Filter by provider id"),
+    capability: str | None = Query(None, description="Filter by capability"),
+    type: str | None = Query(None, alias="type", description="Filter by model type"),
+    include_deprecated: bool = Query(False, description="Include deprecated models"),
+    limit: int = Query(50, ge=1, le=1000, description="Max models returned"),
+):
+    """Cost of a workload on every matching model, cheapest first."""
+    workload = Workload(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cached_ratio=cached_ratio,
+        batch=batch,
+        images=images,
+        video_seconds=video_seconds,
+    )
+    if workload.is_empty():
+        raise HTTPException(status_code=400, detail="Workload is empty: set tokens, images or video_seconds")
+
+    async def build(catalog):
+        return estimate_costs(
+            catalog or await get_catalog(),
+            workload,
+            provider_id=provider,
+            capability=capability,
+            model_type=type,
+            include_deprecated=include_deprecated,
+            limit=limit,
+        )
+
+    key = ("estimate", workload, provider, capability, type, include_deprecated, limit)
+    return await cached_json(request, key, build)
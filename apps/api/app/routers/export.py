@@ -0,0 +1,50 @@
+"""Bulk export API."""
+from datetime import date
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.config import get_catalog_snapshot_only
+from app.services.export_service import DATASETS, FORMATS, parquet_available, stream_export
+
+router = APIRouter()
+
+
+@router.get("/export")
+async def export(
+    format: str = Query("ndjson", description="Output format: ndjson, csv, parquet"),
+    dataset: str = Query("models", description="What to export: models, price_history"),
+    provider: str | None = Query(None, description="models: filter by provider id"),
+    type: str | None = Query(None, alias="type", description="models: filter by model type"),
+    include_deprecated: bool = Query(False, description="models: include deprecated models"),
+    ids: str | None = Query(None, description="price_history: comma-separated model ids (default all)"),
+    date_from: date | None = Query(None, alias="from", description="price_history: start date (inclusive)"),
+    date_to: date | None = Query(None, alias="to", description="price_history: end date (inclusive)"),
+):
+    """Stream the whole catalog or price history with pricing flattened into columns."""
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {format} (use {', '.join(FORMATS)})")
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=400, detail=f"Unknown dataset: {dataset} (use {', '.join(DATASETS)})")
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow on the server")
+    if get_catalog_snapshot_only():
+        # Checked before streaming starts: a failure mid-stream can't change the status code.
+        raise HTTPException(status_code=503, detail="Export needs the database (disabled by CATALOG_SNAPSHOT_ONLY)")
+
+    model_ids = [i.strip() for i in ids.split(",") if i.strip()] if ids else None
+    media_type, extension = FORMATS[format]
+    return StreamingResponse(
+        stream_export(
+            dataset,
+            format,
+            provider_id=provider,
+            model_type=type,
+            include_deprecated=include_deprecated,
+            model_ids=model_ids,
+            date_from=date_from,
+            date_to=date_to,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{extension}"'},
+    )
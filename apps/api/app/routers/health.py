@@ -1,7 +1,9 @@
 """Health check endpoint for Cloud Run."""
 from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 
 from app.limiter import limiter
+from app.startup import readiness
 
 router = APIRouter()
 
@@ -9,5 +11,7 @@ router = APIRouter()
 @router.get("/health")
 @limiter.exempt
 async def health(request: Request):
-    """Liveness/readiness probe. Exempt from rate limiting."""
-    return {"status": "ok"}
+    """Readiness probe: 503 until startup warm-up has finished. Exempt from rate limiting."""
+    if not readiness.ready:
+        return JSONResponse({"status": "starting"}, status_code=503)
+    return {"status": "ok", "warmupSeconds": readiness.warmup_seconds}
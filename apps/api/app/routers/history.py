@@ -0,0 +1,63 @@
+"""Price history API."""
+from datetime import date
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.services.db_service import get_model_by_id
+from app.services.history_service import get_price_history
+from app.services.response_cache import cached_json
+
+router = APIRouter()
+
+# Max models per bulk history request
+MAX_HISTORY_IDS = 50
+
+
+async def _history_page(model_ids, date_from, date_to, limit, cursor):
+    try:
+        return await get_price_history(model_ids, date_from, date_to, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/models/{model_id}/history")
+async def model_history(
+    request: Request,
+    model_id: str,
+    date_from: date | None = Query(None, alias="from", description="Start date (YYYY-MM-DD, inclusive)"),
+    date_to: date | None = Query(None, alias="to", description="End date (YYYY-MM-DD, inclusive)"),
+    limit: int = Query(100, ge=1, le=1000, description="Max points per page"),
+    cursor: str | None = Query(None, description="nextCursor from the previous page"),
+):
+    """Price time series for one model (one point per pricing change)."""
+    async def build(catalog):
+        if not await get_model_by_id(model_id, catalog):
+            raise HTTPException(status_code=404, detail="Model not found")
+        points, next_cursor = await _history_page([model_id], date_from, date_to, limit, cursor)
+        return {"modelId": model_id, "points": points, "nextCursor": next_cursor}
+
+    key = ("history", model_id, date_from, date_to, limit, cursor)
+    return await cached_json(request, key, build)
+
+
+@router.get("/history")
+async def bulk_history(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated model ids (e.g. id1,id2,id3)"),
+    date_from: date | None = Query(None, alias="from", description="Start date (YYYY-MM-DD, inclusive)"),
+    date_to: date | None = Query(None, alias="to", description="End date (YYYY-MM-DD, inclusive)"),
+    limit: int = Query(500, ge=1, le=5000, description="Max points per page (across all models)"),
+    cursor: str | None = Query(None, description="nextCursor from the previous page"),
+):
+    """Price time series for several models, grouped by model id."""
+    model_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))[:MAX_HISTORY_IDS]
+
+    async def build(_catalog):
+        points, next_cursor = await _history_page(model_ids, date_from, date_to, limit, cursor)
+        series: dict[str, list] = {}
+        for p in points:
+            series.setdefault(p["modelId"], []).append(p)
+        return {"series": series, "nextCursor": next_cursor}
+
+    key = ("bulk_history", tuple(model_ids), date_from, date_to, limit, cursor)
+    return await cached_json(request, key, build)
@@ -0,0 +1,28 @@
+"""Internal operational endpoints (not part of the public API schema).
+
+Require `Authorization: Bearer <INTERNAL_TOKEN>`; with no token configured
+they are disabled and answer 404.
+"""
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.config import get_internal_token
+from app.db import pool_status
+
+
+def require_internal_token(authorization: str | None = Header(None)) -> None:
+    token = get_internal_token()
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not authorization or not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=401, detail="Unauthorized", headers={"WWW-Authenticate": "Bearer"})
+
+
+router = APIRouter(include_in_schema=False, dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/internal/pool")
+async def pool():
+    """Connection pool size, in-use/idle connections and acquire-wait stats."""
+    return pool_status()
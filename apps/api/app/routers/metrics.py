@@ -0,0 +1,51 @@
+"""Prometheus metrics endpoint."""
+from fastapi import APIRouter, Request, Response
+
+from app import metrics
+from app.db import pool_status
+from app.limiter import limiter
+from app.services.catalog import catalog_store
+
+router = APIRouter(include_in_schema=False)
+
+
+def _runtime_gauges() -> dict[str, float]:
+    pool = pool_status()
+    gauges = {
+        "db_pool_acquires": pool["acquires"],
+        "db_pool_acquire_timeouts": pool["acquireTimeouts"],
+    }
+    if pool["initialized"]:
+        gauges.update({
+            "db_pool_size": pool["size"],
+            "db_pool_max_size": pool["maxSize"],
+            "db_pool_in_use": pool["inUse"],
+            "db_pool_idle": pool["idle"],
+        })
+    snapshot = catalog_store.snapshot
+    if snapshot is not None:
+        gauges["catalog_models"] = len(snapshot.models)
+        gauges["catalog_providers"] = len(snapshot.providers)
+    return gauges
+
+
+metrics.register(metrics.Gauges(
+    {
+        "db_pool_acquires": "Connections acquired from the pool since start",
+        "db_pool_acquire_timeouts": "Pool acquires that timed out since start",
+        "db_pool_size": "Open pool connections",
+        "db_pool_max_size": "Configured max pool connections",
+        "db_pool_in_use": "Pool connections checked out",
+        "db_pool_idle": "Idle pool connections",
+        "catalog_models": "Models in the in-memory catalog snapshot",
+        "catalog_providers": "Providers in the in-memory catalog snapshot",
+    },
+    _runtime_gauges,
+))
+
+
+@router.get("/metrics")
+@limiter.exempt
+async def prometheus_metrics(request: Request):
+    """Request, query, serialization and pool metrics in Prometheus text format."""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,35 +1,68 @@
 """Models API."""
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 
-from app.services.db_service import get_models, get_model_by_id
+from app.services.db_service import get_models_page, get_model_by_id
+from app.services.records import parse_fields
+from app.services.response_cache import Payload, cached_json
 
 router = APIRouter()
 
 
 @router.get("/models")
 async def list_models(
+    request: Request,
     provider: str | None = Query(None, description="Filter by provider id"),
     capability: str | None = Query(None, description="Filter by capability"),
     type: str | None = Query(None, alias="type", description="Filter by model type"),
     include_deprecated: bool = Query(False, description="Include deprecated models"),
-    sort_by: str = Query("provider", description="Sort by: input, output, cache, context, name, provider"),
+    sort_by: str = Query("provider", description="Sort by: input, output, cache, blended (3:1 input:output), context, name, provider"),
     sort_order: str = Query("asc", description="Sort order: asc, desc"),
+    limit: int | None = Query(None, ge=1, le=1000, description="Page size (omit for all models)"),
+    cursor: str | None = Query(None, description="X-Next-Cursor from the previous page"),
+    fields: str | None = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,name,pricing.inputPerMillionTokens",
+    ),
 ):
-    """List models with optional filters and sorting."""
-    return await get_models(
-        provider_id=provider,
-        capability=capability,
-        model_type=type,
-        include_deprecated=include_deprecated,
-        sort_by=sort_by,
-        sort_order=sort_order,
-    )
+    """List models with optional filters, sorting, keyset pagination and field projection.
+
+    The body is always a JSON array; when more rows exist, the X-Next-Cursor
+    header carries the cursor for the next page.
+    """
+    try:
+        spec = parse_fields(fields) if fields else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def build(catalog):
+        try:
+            models, next_cursor = await get_models_page(
+                provider_id=provider,
+                capability=capability,
+                model_type=type,
+                include_deprecated=include_deprecated,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                limit=limit,
+                cursor=cursor,
+                fields=spec,
+                catalog=catalog,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return Payload(models, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+    key = ("models", provider, capability, type, include_deprecated, sort_by, sort_order.lower(), limit, cursor, spec)
+    return await cached_json(request, key, build)
 
 
 @router.get("/models/{model_id}")
-async def get_model(model_id: str):
+async def get_model(request: Request, model_id: str):
     """Get single model by id."""
-    model = await get_model_by_id(model_id)
-    if not model:
-        raise HTTPException(status_code=404, detail="Model not found")
-    return model
+    async def build(catalog):
+        model = await get_model_by_id(model_id, catalog)
+        if not model:
+            raise HTTPException(status_code=404, detail="Model not found")
+        return model
+
+    return await cached_json(request, ("model", model_id), build)
@@ -1,12 +1,13 @@
 """Providers API."""
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 from app.services.db_service import get_providers
+from app.services.response_cache import cached_json
 
 router = APIRouter()
 
 
 @router.get("/providers")
-async def list_providers():
+async def list_providers(request: Request):
     """List all providers."""
-    return await get_providers()
+    return await cached_json(request, ("providers",), get_providers)
@@ -0,0 +1,38 @@
+"""Model search API."""
+from fastapi import APIRouter, Query, Request
+
+from app.services.db_service import get_catalog
+from app.services.response_cache import cached_json
+from app.services.search_index import search_models
+
+router = APIRouter()
+
+
+@router.get("/search")
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100, description="Search text (name, API id, provider, capability)"),
+    provider: str | None = Query(None, description="Filter by provider id"),
+    capability: str | None = Query(None, description="Filter by capability"),
+    type: str | None = Query(None, alias="type", description="Filter by model type"),
+    include_deprecated: bool = Query(False, description="Include deprecated models"),
+    limit: int = Query(20, ge=1, le=100, description="Max results"),
+):
+    """Typo-tolerant model search, best match first."""
+    # Case and surrounding whitespace don't change results; one cached body serves every spelling.
+    query = q.strip().lower()
+
+    async def build(catalog):
+        results = search_models(
+            catalog or await get_catalog(),
+            query,
+            provider_id=provider,
+            capability=capability,
+            model_type=type,
+            include_deprecated=include_deprecated,
+            limit=limit,
+        )
+        return {"query": query, "results": results}
+
+    key = ("search", query, provider, capability, type, include_deprecated, limit)
+    return await cached_json(request, key, build)
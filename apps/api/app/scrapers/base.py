@@ -1,11 +1,16 @@
 """
 Base scraper interface.
-Provider-specific scrapers inherit and implement scrape().
+Provider-specific scrapers inherit and either implement fetch_source() + parse()
+(live pages: async fetch, then a pure CPU-bound parse the job runs in a
+process pool) or override scrape() (static data).
 """
-from abc import ABC, abstractmethod
+from abc import ABC
 from datetime import datetime, timezone
 from typing import Any
 
+from app.scrapers.fetch import FetchResult, NotModified, get_http_client
+from app.scrapers.parse import run_parse
+
 
 class BaseScraper(ABC):
     """Abstract base for provider scrapers."""
@@ -14,13 +19,67 @@ class BaseScraper(ABC):
     provider_name: str
     pricing_url: str
 
-    @abstractmethod
+    def __init__(self) -> None:
+        # Pages fetched this run; see commit_fetches().
+        self.fetched: list[FetchResult] = []
+
     async def scrape(self) -> tuple[dict[str, Any], list[dict[str, Any]]]:
         """
         Scrape provider and models.
         Returns (provider_dict, list of model_dicts).
+        Default: fetch_source(), then parse() in the parse pool (see app.scrapers.parse).
+        """
+        if type(self).parse is BaseScraper.parse:
+            raise TypeError(f"{type(self).__name__} must implement parse() or override scrape()")
+        source = await self.fetch_source()
+        models = await run_parse(self.parse, source)
+        return self._provider(), models
+
+    async def fetch_source(self) -> str:
+        """Raw page(s) that parse() reads; default: pricing_url, NotModified when unchanged."""
+        return await self.fetch_changed()
+
+    def parse(self, source: str) -> list[dict[str, Any]]:
+        """Model dicts from fetch_source() output.
+
+        Must be pure (no I/O, no event loop): it runs in a worker process and
+        is unit-testable against saved HTML fixtures. Use app.scrapers.parse.soup().
+        """
+        raise NotImplementedError(f"{type(self).__name__} must implement parse() or override scrape()")
+
+    def __getstate__(self) -> dict[str, Any]:
+        # parse() is pickled to the pool as a bound method: don't ship this run's page bodies with it.
+        state = self.__dict__.copy()
+        state["fetched"] = []
+        return state
+
+    async def fetch(self, url: str | None = None, conditional: bool = True) -> FetchResult:
+        """GET a page (default: pricing_url) through the shared pooled client.
+
+        With `conditional`, a 304 against the on-disk cache returns the cached
+        body with `not_modified=True`; see fetch_changed() to skip parsing.
+        """
+        result = await get_http_client().fetch(url or self.pricing_url, conditional=conditional)
+        self.fetched.append(result)
+        return result
+
+    async def fetch_changed(self, url: str | None = None) -> str:
+        """Page body, or raise NotModified when it is unchanged since the last run."""
+        result = await self.fetch(url)
+        if result.not_modified:
+            raise NotModified(result.url)
+        return result.text
+
+    def commit_fetches(self) -> None:
+        """Cache validators of the pages fetched this run (call after a successful upsert).
+
+        Until then a failed parse or write leaves no validators behind, so the
+        next run refetches the page instead of skipping it on a 304.
         """
-        pass
+        client = get_http_client()
+        for result in self.fetched:
+            client.commit(result)
+        self.fetched.clear()
 
     def _provider(self) -> dict[str, Any]:
         """Build provider record."""
@@ -0,0 +1,159 @@
+"""
+Shared HTTP client for scrapers.
+
+One pooled (HTTP/2 when `h2` is installed) httpx client for the whole scrape
+run, plus an on-disk response cache keyed by URL. Cached ETag / Last-Modified
+values are sent as conditional headers; a 304 comes back as a FetchResult with
+`not_modified=True` and the cached body, so scrapers can skip parsing.
+
+A fresh 200 is not cached right away: its validators travel on the
+FetchResult and are saved with `commit()` once the scrape job has parsed and
+upserted the page. A run that fails after fetching therefore refetches the
+full page next time instead of getting a 304 and skipping the provider.
+"""
+import hashlib
+import importlib.util
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+USER_AGENT = "ai-models-stats-scraper/0.1 (+https://github.com/eidast/ai-models-stats)"
+
+
+class NotModified(Exception):
+    """Raised by a scraper when its source page is unchanged since the last run (HTTP 304)."""
+
+
+@dataclass
+class FetchResult:
+    """Response body for a URL; `not_modified` means it came from the cache after a 304.
+
+    `validators` (ETag / Last-Modified of a fresh response) are written to the
+    disk cache only by ScraperHttpClient.commit().
+    """
+
+    url: str
+    status_code: int
+    text: str
+    not_modified: bool = False
+    validators: dict[str, str | None] | None = None
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def response_validators(response: httpx.Response) -> dict[str, str | None] | None:
+    """ETag / Last-Modified of a response; None when the server sent neither."""
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    if not etag and not last_modified:
+        return None
+    return {"etag": etag, "lastModified": last_modified}
+
+
+class ResponseDiskCache:
+    """Body + validators per URL, stored as <sha256>.json / <sha256>.body."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def load(self, url: str) -> tuple[dict, str] | None:
+        """(meta, body) for url, or None when not cached / unreadable."""
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text("utf-8"))
+            body = body_path.read_text("utf-8")
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        return meta, body
+
+    def store(self, url: str, validators: dict[str, str | None], body: str) -> None:
+        """Persist body and validators (see response_validators())."""
+        meta_path, body_path = self._paths(url)
+        meta = {"url": url, **validators}
+        # Write body first, then meta; temp file + replace keeps each file whole.
+        for path, data in ((body_path, body), (meta_path, json.dumps(meta))):
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_text(data, "utf-8")
+            os.replace(tmp, path)
+
+
+class ScraperHttpClient:
+    """Pooled HTTP client with conditional-GET caching."""
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        timeout: float = 30.0,
+        max_connections: int = 20,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.cache = ResponseDiskCache(cache_dir) if cache_dir else None
+        self._client = httpx.AsyncClient(
+            http2=_http2_available(),
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            transport=transport,
+        )
+
+    async def fetch(self, url: str, conditional: bool = True) -> FetchResult:
+        """GET url; with `conditional`, revalidate against the disk cache."""
+        cached = self.cache.load(url) if (self.cache and conditional) else None
+        headers = {}
+        if cached:
+            meta, _ = cached
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("lastModified"):
+                headers["If-Modified-Since"] = meta["lastModified"]
+
+        response = await self._client.get(url, headers=headers)
+        if response.status_code == 304 and cached:
+            return FetchResult(url, 304, cached[1], not_modified=True)
+        response.raise_for_status()
+        validators = response_validators(response) if self.cache else None
+        return FetchResult(url, response.status_code, response.text, validators=validators)
+
+    def commit(self, result: FetchResult) -> None:
+        """Cache a fetched page's validators, once its data has been stored successfully."""
+        if self.cache and result.validators:
+            self.cache.store(result.url, result.validators, result.text)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_client: ScraperHttpClient | None = None
+
+
+def get_http_client() -> ScraperHttpClient:
+    """Get or create the shared scraper client (SCRAPE_CACHE_DIR; empty disables the cache)."""
+    global _client
+    if _client is None:
+        cache_dir = os.getenv("SCRAPE_CACHE_DIR", ".cache/scrape").strip()
+        _client = ScraperHttpClient(
+            cache_dir=Path(cache_dir) if cache_dir else None,
+            timeout=float(os.getenv("SCRAPE_HTTP_TIMEOUT_SECONDS", "30")),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client at the end of a scrape run."""
+    global _client
+    if _client:
+        await _client.aclose()
+        _client = None
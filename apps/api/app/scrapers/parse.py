@@ -0,0 +1,74 @@
+"""
+Parse stage for scrapers.
+
+Scrapers fetch pages asynchronously, then turn them into model dicts with a
+pure `parse()` (see BaseScraper). Parsing multi-megabyte HTML is CPU-bound, so
+the scrape job runs it in a shared process pool (SCRAPE_PARSE_WORKERS) to keep
+the event loop free and use every core. Without a pool — the API, benchmarks,
+tests against saved fixtures — parse runs inline.
+
+`soup()` builds BeautifulSoup trees with lxml when it is installed (several
+times faster than the stdlib parser), html.parser otherwise.
+"""
+import asyncio
+import importlib.util
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+
+def soup(html: str):
+    """BeautifulSoup tree for `html` (lxml when available)."""
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+_executor: ProcessPoolExecutor | None = None
+_enabled = False
+
+
+def enable_parse_pool() -> None:
+    """Run parse() in the shared process pool from now on (the scrape job calls this at startup).
+
+    The pool itself starts on the first parse, so runs whose scrapers only
+    return static data never spawn workers.
+    """
+    global _enabled
+    _enabled = True
+
+
+def get_parse_executor() -> ProcessPoolExecutor | None:
+    """Get or create the shared pool (SCRAPE_PARSE_WORKERS, default CPU count; 0 disables)."""
+    global _executor
+    if not _enabled:
+        return None
+    if _executor is None:
+        workers = int(os.getenv("SCRAPE_PARSE_WORKERS", str(os.cpu_count() or 1)))
+        if workers <= 0:
+            return None
+        _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+
+async def run_parse(parse: Callable[..., Any], *args: Any) -> Any:
+    """Call `parse(*args)` in the process pool when enabled, inline otherwise.
+
+    `parse` and its arguments are pickled to the worker, so pass a module-level
+    function or a method of a plain scraper instance.
+    """
+    executor = get_parse_executor()
+    if executor is None:
+        return parse(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, parse, *args)
+
+
+def close_parse_executor() -> None:
+    """Shut down the shared pool at the end of a scrape run."""
+    global _executor, _enabled
+    if _executor:
+        _executor.shutdown()
+        _executor = None
+    _enabled = False
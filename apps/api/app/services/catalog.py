@@ -0,0 +1,156 @@
+"""
+In-memory catalog snapshot — providers and models served from process memory.
+
+The catalog only changes when the scrape job runs, so each worker loads the
+full tables once and answers reads from memory. When the version moves, a new
+snapshot is loaded and swapped in. Requests never wait on a refresh once a
+snapshot exists.
+
+Normally a background watcher (db_service.CatalogWatcher) keeps the snapshot
+current from scrape-job notifications; without one, a cheap version query runs
+on the request path at most every CATALOG_REFRESH_SECONDS.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from app.services.catalog_index import CatalogIndex, keyset_values
+from app.services.records import FieldSpec, ModelRecord, ProviderRecord
+
+
+class Catalog:
+    """Immutable snapshot of providers and models at one data version."""
+
+    def __init__(
+        self,
+        version: Any,
+        providers: list[ProviderRecord],
+        models: list[ModelRecord],
+        orders: dict[tuple[str, bool], list[int]] | None = None,
+    ) -> None:
+        self.version = version
+        self.providers = providers
+        self.models = models
+        self.by_id = {m.id: m for m in models}
+        self.index = CatalogIndex(models, orders)
+        self._derived: dict[str, Any] = {}
+
+    def derived(self, name: str, build: Callable[["Catalog"], Any]) -> Any:
+        """Per-snapshot derived structure, built on first use and dropped with the snapshot."""
+        value = self._derived.get(name)
+        if value is None:
+            value = self._derived[name] = build(self)
+        return value
+
+    def query(
+        self,
+        provider_id: str | None = None,
+        capability: str | None = None,
+        model_type: str | None = None,
+        include_deprecated: bool = False,
+        sort_by: str = "provider",
+        sort_order: str = "asc",
+        limit: int | None = None,
+        after: list[Any] | None = None,
+        fields: FieldSpec | None = None,
+    ) -> tuple[list[dict[str, Any]], list[Any] | None]:
+        """Filter, sort and page models in memory (same semantics as the SQL path).
+
+        `after` is the keyset of the last row already served. Returns
+        (rows, keyset of the last row when another page exists, else None).
+        """
+        descending = sort_order.lower() != "asc"
+        mask = self.index.mask(
+            provider_id=provider_id,
+            capability=capability,
+            model_type=model_type,
+            include_deprecated=include_deprecated,
+        )
+        positions = self.index.select(mask, sort_by, descending)
+        start = self.index.start_after(positions, sort_by, descending, after) if after else 0
+        end = len(positions) if limit is None else min(start + limit, len(positions))
+        page = positions[start:end]
+
+        models = self.models
+        if fields:
+            rows = [models[i].project(fields) for i in page]
+        else:
+            rows = [models[i].to_api() for i in page]
+        next_after = keyset_values(models[page[-1]], sort_by) if page and end < len(positions) else None
+        return rows, next_after
+
+    def get(self, model_id: str) -> dict[str, Any] | None:
+        record = self.by_id.get(model_id)
+        return record.to_api() if record else None
+
+    def get_many(self, ids: list[str]) -> list[dict[str, Any]]:
+        """Models for ids, ordered by provider then name (like the SQL path)."""
+        found = [self.by_id[i] for i in dict.fromkeys(ids) if i in self.by_id]
+        found.sort(key=lambda m: (m.provider_id, m.name))
+        return [m.to_api() for m in found]
+
+
+class CatalogStore:
+    """Holds the current snapshot and refreshes it when the data version changes."""
+
+    def __init__(self) -> None:
+        self._snapshot: Catalog | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        # True while a background watcher keeps the snapshot current (no request-path checks)
+        self.watched = False
+
+    @property
+    def snapshot(self) -> Catalog | None:
+        return self._snapshot
+
+    def set(self, snapshot: Catalog) -> None:
+        """Swap in a snapshot (single reference assignment, safe for readers)."""
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Force a version check on the next read."""
+        self._checked_at = 0.0
+
+    async def get(
+        self,
+        fetch_version: Callable[[], Awaitable[Any]],
+        load: Callable[[], Awaitable[Catalog]],
+        ttl: float,
+    ) -> Catalog:
+        """Return the current snapshot, checking the version at most every `ttl` seconds."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            if self.watched or time.monotonic() - self._checked_at < ttl or self._lock.locked():
+                # Fresh enough, or another request is already refreshing: serve what we have.
+                return snapshot
+        async with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and time.monotonic() - self._checked_at < ttl:
+                return snapshot
+            if snapshot is None or await fetch_version() != snapshot.version:
+                snapshot = await load()
+            self.set(snapshot)
+            return snapshot
+
+    async def refresh(
+        self,
+        fetch_version: Callable[[], Awaitable[Any]],
+        load: Callable[[], Awaitable[Catalog]],
+        force: bool = False,
+    ) -> bool:
+        """Check the version now and swap in a new snapshot if it moved; True if swapped.
+
+        With `force`, reload without checking (the data is known to have changed).
+        """
+        async with self._lock:
+            snapshot = self._snapshot
+            if not force and snapshot is not None and await fetch_version() == snapshot.version:
+                self._checked_at = time.monotonic()
+                return False
+            self.set(await load())
+            return True
+
+
+catalog_store = CatalogStore()
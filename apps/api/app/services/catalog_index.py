@@ -0,0 +1,151 @@
+"""
+Catalog query engine — presorted orders and filter bitsets.
+
+Built once per snapshot. Every sort key gets a precomputed ascending and
+descending order (NULLS LAST in both directions, like the SQL path), and every
+provider / type / capability value gets a bitset (Python int, bit i = model i).
+A query is then a bitset intersection followed by an ordered scan — no
+per-request sorting.
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any
+
+from app.services.records import ModelRecord
+
+# Sort keys accepted by /api/models (sort_by)
+SORT_KEYS = ("input", "output", "cache", "blended", "context", "name", "provider")
+
+
+def sort_value(model: ModelRecord, sort_by: str) -> Any:
+    """Sort value for a model; None sorts last in both directions."""
+    if sort_by == "input":
+        return model.input_price
+    if sort_by == "output":
+        return model.output_price
+    if sort_by == "cache":
+        return model.cache_price
+    if sort_by == "blended":
+        return model.blended_price
+    if sort_by == "context":
+        return model.context_length
+    if sort_by == "name":
+        return model.name
+    return (model.provider_id, model.name)
+
+
+def keyset_values(model: ModelRecord, sort_by: str) -> list[Any]:
+    """A model's position in the `sort_by` order: sort value(s) then id (the tie-breaker)."""
+    if sort_by == "provider":
+        return [model.provider_id, model.name, model.id]
+    return [sort_value(model, sort_by), model.id]
+
+
+def is_after(values: list[Any], cursor: list[Any], descending: bool) -> bool:
+    """True if keyset `values` sorts strictly after `cursor` (NULLS LAST in both directions)."""
+    for v, c in zip(values, cursor):
+        if v == c:
+            continue
+        if c is None:
+            return False
+        if v is None:
+            return True
+        return v < c if descending else v > c
+    return False
+
+
+def _bitset(indices: list[int], size: int) -> int:
+    """Build an int bitset from positions without quadratic big-int ORs."""
+    buf = bytearray((size + 7) // 8)
+    for i in indices:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+class CatalogIndex:
+    """Presorted orders and per-value bitsets over a fixed list of models."""
+
+    def __init__(
+        self,
+        models: list[ModelRecord],
+        orders: dict[tuple[str, bool], list[int]] | None = None,
+    ) -> None:
+        """`orders` may be passed precomputed (e.g. from a snapshot file) to skip sorting."""
+        self.models = models
+        self.size = len(models)
+        self.position = {m.id: i for i, m in enumerate(models)}
+        self.all_mask = (1 << self.size) - 1
+
+        providers: dict[str, list[int]] = defaultdict(list)
+        types: dict[str, list[int]] = defaultdict(list)
+        capabilities: dict[str, list[int]] = defaultdict(list)
+        active: list[int] = []
+        for i, m in enumerate(models):
+            providers[m.provider_id].append(i)
+            types[m.type].append(i)
+            for cap in m.capabilities:
+                capabilities[cap].append(i)
+            if not m.deprecated:
+                active.append(i)
+
+        self.by_provider = {k: _bitset(v, self.size) for k, v in providers.items()}
+        self.by_type = {k: _bitset(v, self.size) for k, v in types.items()}
+        self.by_capability = {k: _bitset(v, self.size) for k, v in capabilities.items()}
+        self.active_mask = _bitset(active, self.size)
+
+        # (sort_key, descending) -> model positions, and model position -> rank in that order
+        self.orders: dict[tuple[str, bool], list[int]] = dict(orders) if orders else {}
+        self.ranks: dict[tuple[str, bool], list[int]] = {}
+        for key in SORT_KEYS if not orders else ():
+            values = [sort_value(m, key) for m in models]
+            present = [i for i in range(self.size) if values[i] is not None]
+            missing = [i for i in range(self.size) if values[i] is None]
+            # Tie-break on id (same direction as the sort) so the order is deterministic.
+            asc = sorted(present, key=lambda i: (values[i], models[i].id))
+            missing.sort(key=lambda i: models[i].id)
+            self.orders[(key, False)] = asc + missing
+            self.orders[(key, True)] = asc[::-1] + missing[::-1]
+        for order_key, order in self.orders.items():
+            rank = [0] * self.size
+            for r, i in enumerate(order):
+                rank[i] = r
+            self.ranks[order_key] = rank
+
+    def mask(
+        self,
+        provider_id: str | None = None,
+        capability: str | None = None,
+        model_type: str | None = None,
+        include_deprecated: bool = False,
+    ) -> int:
+        """Bitset of models matching all filters."""
+        mask = self.all_mask if include_deprecated else self.active_mask
+        if provider_id:
+            mask &= self.by_provider.get(provider_id, 0)
+        if capability:
+            mask &= self.by_capability.get(capability, 0)
+        if model_type:
+            mask &= self.by_type.get(model_type, 0)
+        return mask
+
+    def select(self, mask: int, sort_by: str, descending: bool = False) -> list[int]:
+        """Positions in `mask`, in presorted order for `sort_by`."""
+        order = self.orders[(sort_by, descending)]
+        if mask == self.all_mask:
+            return order
+        if not mask:
+            return []
+        bits = mask.to_bytes((self.size + 7) // 8, "little")
+        return [i for i in order if bits[i >> 3] >> (i & 7) & 1]
+
+    def start_after(self, positions: list[int], sort_by: str, descending: bool, cursor: list[Any]) -> int:
+        """Offset in `positions` (a select() result) of the first model after keyset `cursor`."""
+        pos = self.position.get(cursor[-1])
+        if pos is not None and keyset_values(self.models[pos], sort_by) == cursor:
+            rank = self.ranks[(sort_by, descending)]
+            return bisect_right(positions, rank[pos], key=rank.__getitem__)
+        # Cursor row changed or disappeared since the page was served: locate it by value.
+        for offset, i in enumerate(positions):
+            if is_after(keyset_values(self.models[i], sort_by), cursor, descending):
+                return offset
+        return len(positions)
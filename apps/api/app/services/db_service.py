@@ -1,97 +1,295 @@
 """
 Database service — models and providers CRUD.
 """
-import json
-from typing import Any
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from typing import Any, AsyncIterator
 
 import asyncpg
 
-from app.db import get_pool
+from app.config import (
+    get_catalog_cache_enabled,
+    get_catalog_refresh_seconds,
+    get_catalog_snapshot_only,
+    get_catalog_snapshot_path,
+    get_export_concurrency,
+)
+from app.db import CATALOG_VERSION_CHANNEL, Listener, acquire, fetch, fetchrow
+from app.services.catalog import Catalog, catalog_store
+from app.services.catalog_index import SORT_KEYS
+from app.services.cursors import decode_cursor, encode_cursor
+from app.services.records import (
+    MODEL_FIELDS,
+    FieldSpec,
+    ModelRecord,
+    ProviderRecord,
+    api_value,
+    project,
+    spec_columns,
+)
 
+logger = logging.getLogger(__name__)
 
-def _parse_jsonb(val: Any) -> Any:
-    """Parse JSONB from DB — may be dict or JSON string."""
-    if val is None:
-        return None
-    if isinstance(val, dict):
-        return val
-    if isinstance(val, str):
-        return json.loads(val)
-    return val
+# Model reads go to the catalog_view materialized view (migration 007), refreshed by the
+# scrape/seed jobs; writes to `models` never block them.
+MODELS_READ_TABLE = "catalog_view"
+
+# Explicit column lists (no SELECT * on read paths)
+PROVIDER_COLUMNS = "id, name, pricing_url, api_docs_url, last_updated"
+MODEL_COLUMNS = ", ".join(MODEL_FIELDS.values())
 
 
 def _row_to_provider(row: asyncpg.Record) -> dict[str, Any]:
-    return {
-        "id": row["id"],
-        "name": row["name"],
-        "pricingUrl": row["pricing_url"],
-        "apiDocsUrl": row["api_docs_url"],
-        "lastUpdated": row["last_updated"].isoformat() if row["last_updated"] else None,
-    }
+    return ProviderRecord.from_row(row).to_api()
 
 
 def _row_to_model(row: asyncpg.Record) -> dict[str, Any]:
-    return {
-        "id": row["id"],
-        "providerId": row["provider_id"],
-        "name": row["name"],
-        "apiId": row["api_id"],
-        "type": row["type"],
-        "modalities": list(row["modalities"]) if row["modalities"] else [],
-        "capabilities": list(row["capabilities"]) if row["capabilities"] else [],
-        "contextLength": row["context_length"],
-        "maxOutputTokens": row["max_output_tokens"],
-        "deprecated": row["deprecated"],
-        "deprecationDate": row["deprecation_date"].isoformat() if row["deprecation_date"] else None,
-        "pricing": _parse_jsonb(row["pricing"]),
-        "selfHosted": _parse_jsonb(row["self_hosted"]),
-        "sourceUrl": row["source_url"],
-        "lastUpdated": row["last_updated"].isoformat() if row["last_updated"] else None,
-    }
-
-
-async def get_providers() -> list[dict[str, Any]]:
+    return ModelRecord.from_row(row).to_api()
+
+
+# Data-version probe: row counts, latest last_updated and a digest of every row's
+# content_hash, so any written change moves it (a changed row keeps its count and need not
+# carry the newest last_updated). Models are versioned from the view, so the snapshot only
+# moves once the view is refreshed.
+CATALOG_VERSION_QUERY = f"""
+SELECT
+  (SELECT count(*) FROM providers) AS providers_count,
+  (SELECT max(last_updated) FROM providers) AS providers_updated,
+  (SELECT md5(string_agg(content_hash, '' ORDER BY id)) FROM providers) AS providers_digest,
+  (SELECT count(*) FROM {MODELS_READ_TABLE}) AS models_count,
+  (SELECT max(last_updated) FROM {MODELS_READ_TABLE}) AS models_updated,
+  (SELECT md5(string_agg(content_hash, '' ORDER BY id)) FROM {MODELS_READ_TABLE}) AS models_digest
+"""
+
+
+async def _fetch_catalog_version() -> tuple:
+    """Current data version of the providers/models tables."""
+    async with acquire() as conn:
+        row = await fetchrow(conn, "catalog_version", CATALOG_VERSION_QUERY)
+    return tuple(row)
+
+
+async def load_catalog() -> Catalog:
+    """Load full providers/models tables into a snapshot (one consistent read)."""
+    async with acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            version = tuple(await fetchrow(conn, "catalog_version", CATALOG_VERSION_QUERY))
+            provider_rows = await fetch(
+                conn, "catalog_providers", f"SELECT {PROVIDER_COLUMNS} FROM providers ORDER BY name"
+            )
+            model_rows = await fetch(
+                conn,
+                "catalog_models",
+                f"SELECT {MODEL_COLUMNS} FROM {MODELS_READ_TABLE} ORDER BY provider_id, name",
+            )
+    return Catalog(
+        version,
+        [ProviderRecord.from_row(r) for r in provider_rows],
+        [ModelRecord.from_row(r) for r in model_rows],
+    )
+
+
+async def get_catalog() -> Catalog:
+    """Current in-memory catalog snapshot (loaded/refreshed on demand)."""
+    if get_catalog_snapshot_only():
+        return await catalog_store.get(_fetch_snapshot_version, _load_snapshot, get_catalog_refresh_seconds())
+    return await catalog_store.get(_fetch_catalog_version, load_catalog, get_catalog_refresh_seconds())
+
+
+async def _current(catalog: Catalog | None) -> Catalog:
+    """`catalog` when the caller already holds one (e.g. the response cache), else the current one."""
+    return catalog if catalog is not None else await get_catalog()
+
+
+async def _fetch_snapshot_version() -> str | None:
+    from app.services.snapshot import snapshot_version
+
+    return snapshot_version(get_catalog_snapshot_path())
+
+
+async def _load_snapshot() -> Catalog:
+    from app.services.snapshot import read_snapshot
+
+    # Off the event loop: unpacking and indexing a large catalog takes a while.
+    return await asyncio.to_thread(read_snapshot, get_catalog_snapshot_path(), True)
+
+
+class CatalogWatcher:
+    """Keeps catalog_store current in the background.
+
+    LISTENs on CATALOG_VERSION_CHANNEL (the scrape job NOTIFYs after publishing)
+    and reloads on every notification without consulting the version probe, and
+    checks the version every `interval` seconds as a fallback, so requests never
+    query the version themselves. Refreshes are coalesced: a burst of
+    notifications costs at most two reloads (the one running and one after it).
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.listener = Listener(CATALOG_VERSION_CHANNEL, self._on_notify, self.request_refresh)
+        self._poll_task: asyncio.Task | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self._again = False
+        self._force = False
+
+    def start(self) -> None:
+        catalog_store.watched = True
+        self.listener.start()
+        self._poll_task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        catalog_store.watched = False
+        await self.listener.stop()
+        for task in (self._poll_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+    def request_refresh(self, force: bool = False) -> None:
+        """Schedule a version check, or with `force` a reload (runs once more if one is in flight)."""
+        self._force = self._force or force
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._again = True
+            return
+        self._refresh_task = asyncio.create_task(self._refresh())
+
+    def _on_notify(self, payload: str) -> None:
+        # publish_catalog only notifies after writing: reload even if the probe looks unchanged.
+        self.request_refresh(force=True)
+
+    async def _refresh(self) -> None:
+        while True:
+            self._again = False
+            force, self._force = self._force, False
+            try:
+                await catalog_store.refresh(_fetch_catalog_version, load_catalog, force=force)
+            except Exception as e:
+                logger.warning("Catalog refresh failed: %s", e)
+            if not self._again:
+                return
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.request_refresh()
+
+
+async def get_providers(catalog: Catalog | None = None) -> list[dict[str, Any]]:
     """Fetch all providers."""
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM providers ORDER BY name")
+    if get_catalog_cache_enabled():
+        return [p.to_api() for p in (await _current(catalog)).providers]
+    async with acquire() as conn:
+        rows = await fetch(conn, "providers", f"SELECT {PROVIDER_COLUMNS} FROM providers ORDER BY name")
     return [_row_to_provider(r) for r in rows]
 
 
-# Valid sort columns: input/output/cache from JSONB, context from column
-SORT_COLUMNS = {"input", "output", "cache", "context", "name", "provider"}
+# Valid sort columns: prices (input/output/cache, blended 3:1), context, name, provider
+SORT_COLUMNS = set(SORT_KEYS)
+
+# Sort key -> ordered (SQL expression, nullable) pairs; id breaks ties so keyset paging is exact.
+# Prices are numeric columns of catalog_view; each order has a matching partial index
+# on active models (migration 007), so pages need no Sort step.
+SORT_EXPRESSIONS: dict[str, list[tuple[str, bool]]] = {
+    "input": [("input_price", True), ("id", False)],
+    "output": [("output_price", True), ("id", False)],
+    "cache": [("cache_price", True), ("id", False)],
+    "blended": [("blended_price_3_1", True), ("id", False)],
+    "context": [("context_length", True), ("id", False)],
+    "name": [("name", False), ("id", False)],
+    "provider": [("provider_id", False), ("name", False), ("id", False)],
+}
+
+# Sort columns compared as NUMERIC (cursor values arrive as JSON floats)
+_NUMERIC_SORT_COLUMNS = {"input_price", "output_price", "cache_price", "blended_price_3_1"}
 
 
 def _order_clause(sort_by: str, sort_order: str) -> str:
-    """Build ORDER BY clause. sort_order: asc|desc."""
-    asc = "ASC" if sort_order.lower() == "asc" else "DESC"
-    nulls = "NULLS LAST"
-    # NULLIF avoids cast error on empty string
-    if sort_by == "input":
-        return f"(NULLIF(pricing->>'inputPerMillionTokens', '')::numeric) {asc} {nulls}"
-    if sort_by == "output":
-        return f"(NULLIF(pricing->>'outputPerMillionTokens', '')::numeric) {asc} {nulls}"
-    if sort_by == "cache":
-        return f"(NULLIF(pricing->>'cacheInputPerMillionTokens', '')::numeric) {asc} {nulls}"
-    if sort_by == "context":
-        return f"context_length {asc} {nulls}"
-    if sort_by == "name":
-        return f"name {asc}"
-    if sort_by == "provider":
-        return f"provider_id {asc}, name {asc}"
-    return "provider_id, name"
+    """Build ORDER BY clause. sort_order: asc|desc. NULLS LAST in both directions."""
+    direction = "ASC" if sort_order.lower() == "asc" else "DESC"
+    return ", ".join(
+        f"{expr} {direction}" + (" NULLS LAST" if nullable else "")
+        for expr, nullable in SORT_EXPRESSIONS.get(sort_by, SORT_EXPRESSIONS["provider"])
+    )
 
 
-async def get_models(
+def _keyset_condition(sort_by: str, descending: bool, after: list[Any], n: int) -> tuple[str, list[Any], int]:
+    """WHERE fragment selecting rows strictly after keyset `after` (NULLS LAST aware).
+
+    Returns (sql, args, last placeholder number).
+    """
+    op = "<" if descending else ">"
+    args: list[Any] = []
+    equal: list[str] = []
+    branches: list[str] = []
+    for (expr, nullable), value in zip(SORT_EXPRESSIONS[sort_by], after):
+        if value is None:
+            # Cursor is inside the NULL tail: only later columns can advance.
+            equal.append(f"{expr} IS NULL")
+            continue
+        n += 1
+        args.append(Decimal(str(value)) if expr in _NUMERIC_SORT_COLUMNS else value)
+        step = f"{expr} {op} ${n}"
+        if nullable:
+            step = f"({step} OR {expr} IS NULL)"
+        branches.append(" AND ".join(equal + [step]))
+        equal.append(f"{expr} = ${n}")
+    return "(" + " OR ".join(branches or ["false"]) + ")", args, n
+
+
+def _keyset_json(value: Any) -> Any:
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _decode_models_cursor(cursor: str, sort_by: str, descending: bool) -> list[Any]:
+    """Keyset values from a /models cursor; ValueError if malformed or for another sort."""
+    values = decode_cursor(cursor)
+    if values[:2] != [sort_by, descending] or len(values) != 2 + len(SORT_EXPRESSIONS[sort_by]):
+        raise ValueError("Invalid cursor for this sort")
+    return values[2:]
+
+
+async def get_models_page(
     provider_id: str | None = None,
     capability: str | None = None,
     model_type: str | None = None,
     include_deprecated: bool = False,
     sort_by: str = "provider",
     sort_order: str = "asc",
-) -> list[dict[str, Any]]:
-    """Fetch models with optional filters and sorting."""
-    pool = await get_pool()
+    limit: int | None = None,
+    cursor: str | None = None,
+    fields: FieldSpec | None = None,
+    catalog: Catalog | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Fetch a page of models with optional filters, sorting, keyset cursor and field projection.
+
+    Returns (models, next_cursor); next_cursor is None on the last page.
+    Raises ValueError for a malformed cursor. With the catalog cache on, reads
+    `catalog` if given (else the current snapshot).
+    """
+    order_col = sort_by if sort_by in SORT_COLUMNS else "provider"
+    descending = sort_order.lower() != "asc"
+    after = _decode_models_cursor(cursor, order_col, descending) if cursor else None
+
+    if get_catalog_cache_enabled():
+        rows, next_after = (await _current(catalog)).query(
+            provider_id=provider_id,
+            capability=capability,
+            model_type=model_type,
+            include_deprecated=include_deprecated,
+            sort_by=order_col,
+            sort_order=sort_order,
+            limit=limit,
+            after=after,
+            fields=fields,
+        )
+        next_cursor = encode_cursor([order_col, descending, *next_after]) if next_after else None
+        return rows, next_cursor
+
     conditions = []
     args: list[Any] = []
     n = 0
@@ -110,35 +308,150 @@ async def get_models(
         args.append(model_type)
     if not include_deprecated:
         conditions.append("deprecated = false")
+    if after:
+        keyset_sql, keyset_args, n = _keyset_condition(order_col, descending, after, n)
+        conditions.append(keyset_sql)
+        args.extend(keyset_args)
+
+    columns = spec_columns(fields) if fields else list(MODEL_FIELDS.values())
+    select = ", ".join(columns)
+    if limit is not None:
+        # Sort expressions travel with the rows so the next cursor can be built.
+        select += "".join(f", {expr} AS _k{i}" for i, (expr, _) in enumerate(SORT_EXPRESSIONS[order_col]))
 
     where = " AND ".join(conditions) if conditions else "1=1"
-    order_col = sort_by if sort_by in SORT_COLUMNS else "provider"
     order_clause = _order_clause(order_col, sort_order)
-    query = f"SELECT * FROM models WHERE {where} ORDER BY {order_clause}"
+    query = f"SELECT {select} FROM {MODELS_READ_TABLE} WHERE {where} ORDER BY {order_clause}"
+    if limit is not None:
+        n += 1
+        query += f" LIMIT ${n}"
+        args.append(limit + 1)
 
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(query, *args)
-    return [_row_to_model(r) for r in rows]
+    async with acquire() as conn:
+        rows = await fetch(conn, "models_page", query, *args)
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        keys = [_keyset_json(last[f"_k{i}"]) for i in range(len(SORT_EXPRESSIONS[order_col]))]
+        next_cursor = encode_cursor([order_col, descending, *keys])
+    if fields:
+        return [project(lambda c, r=r: api_value(c, r[c]), fields) for r in rows], next_cursor
+    return [_row_to_model(r) for r in rows], next_cursor
 
 
-async def get_model_by_id(model_id: str) -> dict[str, Any] | None:
+async def get_models(
+    provider_id: str | None = None,
+    capability: str | None = None,
+    model_type: str | None = None,
+    include_deprecated: bool = False,
+    sort_by: str = "provider",
+    sort_order: str = "asc",
+) -> list[dict[str, Any]]:
+    """Fetch models with optional filters and sorting."""
+    models, _ = await get_models_page(
+        provider_id=provider_id,
+        capability=capability,
+        model_type=model_type,
+        include_deprecated=include_deprecated,
+        sort_by=sort_by,
+        sort_order=sort_order,
+    )
+    return models
+
+
+async def get_model_by_id(model_id: str, catalog: Catalog | None = None) -> dict[str, Any] | None:
     """Fetch single model by id."""
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow("SELECT * FROM models WHERE id = $1", model_id)
+    if get_catalog_cache_enabled():
+        return (await _current(catalog)).get(model_id)
+    async with acquire() as conn:
+        row = await fetchrow(
+            conn, "model_by_id", f"SELECT {MODEL_COLUMNS} FROM {MODELS_READ_TABLE} WHERE id = $1", model_id
+        )
     if not row:
         return None
     return _row_to_model(row)
 
 
-async def get_models_by_ids(ids: list[str]) -> list[dict[str, Any]]:
+async def get_models_by_ids(ids: list[str], catalog: Catalog | None = None) -> list[dict[str, Any]]:
     """Fetch models by list of ids."""
     if not ids:
         return []
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            "SELECT * FROM models WHERE id = ANY($1::varchar[]) ORDER BY provider_id, name",
+    if get_catalog_cache_enabled():
+        return (await _current(catalog)).get_many(ids)
+    async with acquire() as conn:
+        rows = await fetch(
+            conn,
+            "models_by_ids",
+            f"SELECT {MODEL_COLUMNS} FROM {MODELS_READ_TABLE} WHERE id = ANY($1::varchar[]) ORDER BY provider_id, name",
             ids,
         )
     return [_row_to_model(r) for r in rows]
+
+
+# Rows per round trip when streaming exports through a server-side cursor
+EXPORT_PREFETCH = 500
+
+# Exported model columns; pricing is flattened separately (one column per key)
+MODEL_EXPORT_COLUMNS = [c for c in MODEL_FIELDS.values() if c != "pricing"]
+
+
+def pricing_keys_query(table: str, where: str) -> str:
+    """Distinct pricing keys of matching rows, and whether every value of the key is numeric."""
+    return (
+        "SELECT p.key, bool_and(jsonb_typeof(p.value) = 'number') AS numeric "
+        f"FROM {table}, jsonb_each({table}.pricing) AS p WHERE {where} "
+        "GROUP BY p.key ORDER BY p.key"
+    )
+
+
+_export_slots: asyncio.Semaphore | None = None
+
+
+def _export_semaphore() -> asyncio.Semaphore:
+    """Caps concurrent exports (EXPORT_MAX_CONCURRENCY); further exports wait for a slot."""
+    global _export_slots
+    if _export_slots is None:
+        _export_slots = asyncio.Semaphore(get_export_concurrency())
+    return _export_slots
+
+
+@asynccontextmanager
+async def open_export(
+    query: str,
+    keys_query: str,
+    args: list[Any],
+) -> AsyncIterator[tuple[list[tuple[str, bool]], Any]]:
+    """Pricing keys plus a server-side cursor over `query`, in one consistent read.
+
+    Yields (pricing_keys, cursor); iterate the cursor with `async for`. Rows are
+    fetched EXPORT_PREFETCH at a time, so memory stays bounded whatever the
+    table size. Holds one pooled connection until the block exits, however slow
+    the client, so at most EXPORT_MAX_CONCURRENCY exports hold one at a time.
+    """
+    async with _export_semaphore(), acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            keys = [(r["key"], r["numeric"]) for r in await fetch(conn, "export_pricing_keys", keys_query, *args)]
+            yield keys, conn.cursor(query, *args, prefetch=EXPORT_PREFETCH)
+
+
+def open_models_export(
+    provider_id: str | None = None,
+    model_type: str | None = None,
+    include_deprecated: bool = False,
+):
+    """Streaming export of models (see open_export), ordered by provider then name."""
+    conditions = []
+    args: list[Any] = []
+    if provider_id:
+        args.append(provider_id)
+        conditions.append(f"provider_id = ${len(args)}")
+    if model_type:
+        args.append(model_type)
+        conditions.append(f"type = ${len(args)}")
+    if not include_deprecated:
+        conditions.append("deprecated = false")
+    where = " AND ".join(conditions) if conditions else "1=1"
+    query = f"SELECT {MODEL_COLUMNS} FROM {MODELS_READ_TABLE} WHERE {where} ORDER BY provider_id, name, id"
+    return open_export(query, pricing_keys_query(MODELS_READ_TABLE, where), args)
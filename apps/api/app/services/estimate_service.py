@@ -0,0 +1,140 @@
+"""
+Workload cost estimation over the whole catalog.
+
+Pricing is laid out once per catalog snapshot as NumPy columns (NaN = not
+priced). An estimate is a handful of array operations plus a top-k sort over
+the matching models, so ranking thousands of models stays sub-millisecond.
+
+NumPy is imported on first use (~75 ms), not with the app, to keep cold
+starts short; the startup warm-up normally pays for it before traffic.
+"""
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+from app.services.catalog import Catalog
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Column name -> pricing JSONB key (as written by the scrapers)
+PRICE_FIELDS = {
+    "input": "inputPerMillionTokens",
+    "output": "outputPerMillionTokens",
+    "cache": "cacheInputPerMillionTokens",
+    "batch_input": "batchInputPerMillionTokens",
+    "batch_output": "batchOutputPerMillionTokens",
+    "image": "imageOutputPerImage",
+    "video": "videoPerSecond",
+}
+
+PER_MILLION = 1_000_000.0
+
+
+@dataclass(frozen=True)
+class Workload:
+    """Usage to price. cached_ratio is the share of input tokens served from cache."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_ratio: float = 0.0
+    batch: bool = False
+    images: int = 0
+    video_seconds: float = 0.0
+
+    def is_empty(self) -> bool:
+        return not (self.input_tokens or self.output_tokens or self.images or self.video_seconds)
+
+
+class PriceColumns:
+    """Columnar per-model prices for one snapshot, with batch/cache fallbacks resolved up front."""
+
+    def __init__(self, catalog: Catalog) -> None:
+        import numpy as np
+
+        models = catalog.models
+        self.size = len(models)
+        raw = {
+            name: np.array(
+                [np.nan if (v := m.price(key)) is None else v for m in models],
+                dtype=np.float64,
+            )
+            for name, key in PRICE_FIELDS.items()
+        }
+        # Batch prices fall back to standard prices; cached input falls back to uncached input.
+        self.input = {False: raw["input"], True: np.where(np.isnan(raw["batch_input"]), raw["input"], raw["batch_input"])}
+        self.output = {False: raw["output"], True: np.where(np.isnan(raw["batch_output"]), raw["output"], raw["batch_output"])}
+        self.cache = {b: np.where(np.isnan(raw["cache"]), self.input[b], raw["cache"]) for b in (False, True)}
+        self.image = raw["image"]
+        self.video = raw["video"]
+
+    def costs(self, w: Workload) -> dict[str, "np.ndarray"]:
+        """Per-component cost arrays; NaN where a requested component has no price."""
+        import numpy as np
+
+        zeros = np.zeros(self.size)
+        cached = w.input_tokens * w.cached_ratio
+        uncached = w.input_tokens - cached
+        parts = {
+            "input": (uncached * self.input[w.batch] + cached * self.cache[w.batch]) / PER_MILLION
+            if w.input_tokens else zeros,
+            "output": w.output_tokens * self.output[w.batch] / PER_MILLION if w.output_tokens else zeros,
+            "image": w.images * self.image if w.images else zeros,
+            "video": w.video_seconds * self.video if w.video_seconds else zeros,
+        }
+        parts["total"] = parts["input"] + parts["output"] + parts["image"] + parts["video"]
+        return parts
+
+
+def _mask_array(mask: int, size: int) -> "np.ndarray":
+    """CatalogIndex bitset -> boolean array."""
+    import numpy as np
+
+    packed = np.frombuffer(mask.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(packed, bitorder="little")[:size].astype(bool)
+
+
+def estimate_costs(
+    catalog: Catalog,
+    workload: Workload,
+    provider_id: str | None = None,
+    capability: str | None = None,
+    model_type: str | None = None,
+    include_deprecated: bool = False,
+    limit: int = 50,
+) -> dict[str, Any]:
+    """Rank matching models by total cost for the workload (cheapest first).
+
+    Models missing a price for any requested component are left out.
+    """
+    import numpy as np
+
+    columns: PriceColumns = catalog.derived("price_columns", PriceColumns)
+    parts = columns.costs(workload)
+    total = parts["total"]
+
+    mask = catalog.index.mask(
+        provider_id=provider_id,
+        capability=capability,
+        model_type=model_type,
+        include_deprecated=include_deprecated,
+    )
+    eligible = np.flatnonzero(_mask_array(mask, columns.size) & np.isfinite(total))
+    costs = total[eligible]
+    if limit < eligible.size:
+        # Top-k: partition first, then sort only the k cheapest.
+        top = np.argpartition(costs, limit - 1)[:limit]
+        ranked = eligible[top[np.argsort(costs[top], kind="stable")]]
+    else:
+        ranked = eligible[np.argsort(costs, kind="stable")]
+
+    rows = []
+    for i in ranked.tolist():
+        m = catalog.models[i]
+        rows.append({
+            "id": m.id,
+            "providerId": m.provider_id,
+            "name": m.name,
+            "type": m.type,
+            "cost": {k: round(float(v[i]), 8) for k, v in parts.items()},
+        })
+    return {"workload": asdict(workload), "matched": int(eligible.size), "models": rows}
@@ -0,0 +1,227 @@
+"""
+Bulk export — NDJSON, CSV or Parquet streamed from a server-side cursor.
+
+Rows come from db_service.open_export a batch at a time and are encoded
+straight into response chunks, so memory stays bounded by the batch size no
+matter how many rows are exported. `pricing` is flattened into one
+`pricing.<key>` column per key present in the exported rows.
+
+Parquet needs the optional `pyarrow` package.
+"""
+import csv
+import importlib.util
+import io
+import json
+import time
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Callable
+
+from app.metrics import export_rows, export_stream_duration
+from app.services.db_service import MODEL_EXPORT_COLUMNS, open_models_export
+from app.services.history_service import open_history_export
+from app.services.records import MODEL_FIELDS, parse_jsonb
+
+# format -> (media type, file extension)
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+DATASETS = ("models", "price_history")
+
+# Rows encoded per response chunk (and per Parquet row group)
+BATCH_ROWS = 1000
+
+# Column kinds: str, int, float, bool, list (of str), json (nested object)
+_COLUMN_NAMES = {column: field for field, column in MODEL_FIELDS.items()}
+_COLUMN_NAMES.update({"model_id": "modelId", "date": "date", "source": "source"})
+_COLUMN_KINDS = {
+    "modalities": "list",
+    "capabilities": "list",
+    "context_length": "int",
+    "max_output_tokens": "int",
+    "deprecated": "bool",
+    "self_hosted": "json",
+}
+HISTORY_EXPORT_COLUMNS = ["model_id", "date", "source"]
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class ExportColumns:
+    """Output columns: the dataset's own columns, then one per pricing key."""
+
+    def __init__(self, columns: list[str], pricing_keys: list[tuple[str, bool]]) -> None:
+        self.columns = columns
+        self.pricing_keys = [key for key, _ in pricing_keys]
+        self.names = [_COLUMN_NAMES[c] for c in columns] + [f"pricing.{k}" for k in self.pricing_keys]
+        self.kinds = [_COLUMN_KINDS.get(c, "str") for c in columns] + [
+            "float" if numeric else "str" for _, numeric in pricing_keys
+        ]
+
+    def values(self, row) -> list[Any]:
+        """One output row: plain values, timestamps as ISO strings, pricing flattened."""
+        out = []
+        for c in self.columns:
+            v = row[c]
+            if isinstance(v, (date, datetime)):
+                v = v.isoformat()
+            elif c == "self_hosted":
+                v = parse_jsonb(v)
+            out.append(v)
+        pricing = parse_jsonb(row["pricing"]) or {}
+        out.extend(pricing.get(k) for k in self.pricing_keys)
+        return out
+
+
+def _ndjson_encoder(columns: ExportColumns) -> tuple[bytes, Callable[[list], bytes], Callable[[], bytes]]:
+    def encode(rows: list) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(columns.names, columns.values(r))), ensure_ascii=False, separators=(",", ":")) + "\n"
+            for r in rows
+        ).encode("utf-8")
+
+    return b"", encode, lambda: b""
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        return ";".join(value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return value
+
+
+def _csv_encoder(columns: ExportColumns) -> tuple[bytes, Callable[[list], bytes], Callable[[], bytes]]:
+    def lines(rows: list[list[Any]]) -> bytes:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerows(rows)
+        return buf.getvalue().encode("utf-8")
+
+    def encode(rows: list) -> bytes:
+        return lines([[_csv_cell(v) for v in columns.values(r)] for r in rows])
+
+    return lines([columns.names]), encode, lambda: b""
+
+
+class _ChunkSink:
+    """Write-only file object whose contents are drained into response chunks."""
+
+    def __init__(self) -> None:
+        self.closed = False
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _parquet_encoder(columns: ExportColumns) -> tuple[bytes, Callable[[list], bytes], Callable[[], bytes]]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {
+        "str": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "list": pa.list_(pa.string()),
+        "json": pa.string(),
+    }
+    schema = pa.schema([(name, types[kind]) for name, kind in zip(columns.names, columns.kinds)])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    def cell(kind: str, value: Any) -> Any:
+        if value is None:
+            return None
+        if kind == "json" or (kind == "str" and isinstance(value, (dict, list))):
+            # Nested JSONB (self_hosted, non-numeric pricing values) as JSON text, not Python repr.
+            return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        if kind == "str":
+            return str(value)
+        if kind == "list":
+            return list(value)
+        return value
+
+    def encode(rows: list) -> bytes:
+        values = [columns.values(r) for r in rows]
+        arrays = [
+            pa.array([cell(kind, row[i]) for row in values], type=schema.field(i).type)
+            for i, kind in enumerate(columns.kinds)
+        ]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        return sink.drain()
+
+    def finish() -> bytes:
+        writer.close()
+        return sink.drain()
+
+    return sink.drain(), encode, finish
+
+
+_ENCODERS = {"ndjson": _ndjson_encoder, "csv": _csv_encoder, "parquet": _parquet_encoder}
+
+
+async def stream_export(
+    dataset: str,
+    fmt: str,
+    provider_id: str | None = None,
+    model_type: str | None = None,
+    include_deprecated: bool = False,
+    model_ids: list[str] | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> AsyncIterator[bytes]:
+    """Encoded export chunks for a dataset ("models" or "price_history") in `fmt`."""
+    if dataset == "price_history":
+        export, columns = open_history_export(model_ids, date_from, date_to), HISTORY_EXPORT_COLUMNS
+    else:
+        export, columns = open_models_export(provider_id, model_type, include_deprecated), MODEL_EXPORT_COLUMNS
+
+    started = time.perf_counter()
+    rows = 0
+    async with export as (pricing_keys, cursor):
+        output = ExportColumns(columns, pricing_keys)
+        header, encode, finish = _ENCODERS[fmt](output)
+        if header:
+            yield header
+        batch = []
+        async for row in cursor:
+            rows += 1
+            batch.append(row)
+            if len(batch) >= BATCH_ROWS:
+                yield encode(batch)
+                batch = []
+        if batch:
+            yield encode(batch)
+        tail = finish()
+        if tail:
+            yield tail
+    # Whole stream, including time spent waiting on the client (not a query timing).
+    export_stream_duration.observe((dataset, fmt), time.perf_counter() - started)
+    export_rows.inc((dataset,), rows)
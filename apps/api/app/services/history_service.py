@@ -0,0 +1,103 @@
+"""
+Price history — time series of model pricing.
+
+Rows are appended by the scrape job only when a model's pricing changes, so
+series stay small. Reads are range scans on idx_price_history_model_date_id
+(migration 009) with keyset pagination on the same (model_id, date, id) key.
+"""
+from datetime import date
+from typing import Any
+
+from app.db import acquire, fetch
+from app.services.cursors import decode_cursor, encode_cursor
+from app.services.db_service import open_export, pricing_keys_query
+from app.services.records import parse_jsonb
+
+
+def _row_to_point(row) -> dict[str, Any]:
+    return {
+        "modelId": row["model_id"],
+        "date": row["date"].isoformat(),
+        "pricing": parse_jsonb(row["pricing"]),
+        "source": row["source"],
+    }
+
+
+async def get_price_history(
+    model_ids: list[str],
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Price points for models, ordered by model then date.
+
+    Returns (points, next_cursor); next_cursor is None on the last page.
+    Raises ValueError for a malformed cursor.
+    """
+    if not model_ids:
+        return [], None
+    conditions = ["model_id = ANY($1::varchar[])"]
+    args: list[Any] = [model_ids]
+    n = 1
+
+    if date_from:
+        n += 1
+        conditions.append(f"date >= ${n}")
+        args.append(date_from)
+    if date_to:
+        n += 1
+        conditions.append(f"date <= ${n}")
+        args.append(date_to)
+    if cursor:
+        try:
+            after_model, after_date, after_id = decode_cursor(cursor)
+            after = [str(after_model), date.fromisoformat(after_date), int(after_id)]
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+        conditions.append(f"(model_id, date, id) > (${n + 1}, ${n + 2}, ${n + 3})")
+        args.extend(after)
+        n += 3
+
+    n += 1
+    args.append(limit + 1)
+    query = (
+        "SELECT id, model_id, date, pricing, source FROM price_history "
+        f"WHERE {' AND '.join(conditions)} "
+        f"ORDER BY model_id, date, id LIMIT ${n}"
+    )
+
+    async with acquire() as conn:
+        rows = await fetch(conn, "price_history", query, *args)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last["model_id"], last["date"].isoformat(), last["id"]])
+    return [_row_to_point(r) for r in rows], next_cursor
+
+
+def open_history_export(
+    model_ids: list[str] | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+):
+    """Streaming export of price points (see db_service.open_export), ordered by model then date."""
+    conditions = []
+    args: list[Any] = []
+    if model_ids:
+        args.append(model_ids)
+        conditions.append(f"model_id = ANY(${len(args)}::varchar[])")
+    if date_from:
+        args.append(date_from)
+        conditions.append(f"date >= ${len(args)}")
+    if date_to:
+        args.append(date_to)
+        conditions.append(f"date <= ${len(args)}")
+    where = " AND ".join(conditions) if conditions else "1=1"
+    query = (
+        "SELECT model_id, date, source, pricing FROM price_history "
+        f"WHERE {where} ORDER BY model_id, date, id"
+    )
+    return open_export(query, pricing_keys_query("price_history", where), args)
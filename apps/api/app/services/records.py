@@ -0,0 +1,251 @@
+"""
+Compact catalog records.
+
+`__slots__` records decoded once at load time: JSONB parsed, timestamps
+formatted, and the repeated low-cardinality strings (provider, type,
+modalities, capabilities, source URLs) interned so every record shares them.
+The hot sort prices are pulled out of `pricing` into float slots.
+"""
+import json
+import math
+import re
+import sys
+from typing import Any, Callable
+
+import asyncpg
+
+
+def parse_jsonb(val: Any) -> Any:
+    """Parse JSONB from DB — may be dict or JSON string."""
+    if val is None:
+        return None
+    if isinstance(val, dict):
+        return val
+    if isinstance(val, str):
+        return json.loads(val)
+    return val
+
+
+def _intern(val: str | None) -> str | None:
+    return sys.intern(val) if val is not None else None
+
+
+def _intern_all(values: Any) -> tuple[str, ...]:
+    return tuple(sys.intern(v) for v in values) if values else ()
+
+
+def _iso(val: Any) -> str | None:
+    if val is None or isinstance(val, str):
+        return val
+    return val.isoformat()
+
+
+# The decimal literals the generated *_price columns cast (migration 006); other strings are NULL there.
+_PRICE_PATTERN = re.compile(r"-?[0-9]+(\.[0-9]*)?([eE][-+]?[0-9]+)?")
+
+
+def _num(val: Any) -> float | None:
+    """Numeric price; None for missing/non-numeric (like the generated *_price columns).
+
+    Booleans, NaN / infinities and strings that aren't plain decimal literals are None as well.
+    """
+    if val is None or isinstance(val, bool):
+        return None
+    if isinstance(val, str) and not _PRICE_PATTERN.fullmatch(val):
+        return None
+    try:
+        num = float(val)
+    except (TypeError, ValueError):
+        return None
+    return num if math.isfinite(num) else None
+
+
+# API field name -> ModelRecord attribute (also the models column name)
+MODEL_FIELDS = {
+    "id": "id",
+    "providerId": "provider_id",
+    "name": "name",
+    "apiId": "api_id",
+    "type": "type",
+    "modalities": "modalities",
+    "capabilities": "capabilities",
+    "contextLength": "context_length",
+    "maxOutputTokens": "max_output_tokens",
+    "deprecated": "deprecated",
+    "deprecationDate": "deprecation_date",
+    "pricing": "pricing",
+    "selfHosted": "self_hosted",
+    "sourceUrl": "source_url",
+    "lastUpdated": "last_updated",
+}
+
+# Parsed `fields=` projection: (API field, pricing sub-key or None)
+FieldSpec = tuple[tuple[str, str | None], ...]
+
+
+def parse_fields(fields: str) -> FieldSpec:
+    """Parse a projection like "id,name,pricing.inputPerMillionTokens".
+
+    Only `pricing` accepts sub-keys. Raises ValueError on unknown fields.
+    """
+    spec: list[tuple[str, str | None]] = []
+    for raw in fields.split(","):
+        field = raw.strip()
+        if not field:
+            continue
+        top, _, sub = field.partition(".")
+        if top not in MODEL_FIELDS or (sub and top != "pricing"):
+            raise ValueError(f"Unknown field: {field}")
+        item = (top, sub or None)
+        if item not in spec:
+            spec.append(item)
+    if not spec:
+        raise ValueError("No fields selected")
+    if ("pricing", None) in spec:
+        # Whole pricing requested: sub-keys are redundant.
+        spec = [s for s in spec if not (s[0] == "pricing" and s[1])]
+    return tuple(spec)
+
+
+def spec_columns(spec: FieldSpec) -> list[str]:
+    """models columns needed to serve a projection."""
+    return list(dict.fromkeys(MODEL_FIELDS[top] for top, _ in spec))
+
+
+def api_value(column: str, value: Any) -> Any:
+    """Column / record value -> API JSON value."""
+    if column in ("pricing", "self_hosted"):
+        return parse_jsonb(value)
+    if column in ("modalities", "capabilities"):
+        return list(value) if value else []
+    if column in ("deprecation_date", "last_updated"):
+        return _iso(value)
+    return value
+
+
+def project(get: Callable[[str], Any], spec: FieldSpec) -> dict[str, Any]:
+    """Build a projected model dict; `get(column)` returns the API value of a column."""
+    out: dict[str, Any] = {}
+    pricing = None
+    for top, sub in spec:
+        if sub:
+            if pricing is None:
+                pricing = get("pricing") or {}
+            out.setdefault("pricing", {})[sub] = pricing.get(sub)
+        else:
+            out[top] = get(MODEL_FIELDS[top])
+    return out
+
+
+class ProviderRecord:
+    __slots__ = ("id", "name", "pricing_url", "api_docs_url", "last_updated")
+
+    def __init__(self, id, name, pricing_url, api_docs_url, last_updated) -> None:
+        self.id = sys.intern(id)
+        self.name = name
+        self.pricing_url = pricing_url
+        self.api_docs_url = api_docs_url
+        self.last_updated = _iso(last_updated)
+
+    @classmethod
+    def from_row(cls, row: asyncpg.Record) -> "ProviderRecord":
+        return cls(row["id"], row["name"], row["pricing_url"], row["api_docs_url"], row["last_updated"])
+
+    @classmethod
+    def from_api(cls, d: dict[str, Any]) -> "ProviderRecord":
+        return cls(d["id"], d["name"], d["pricingUrl"], d.get("apiDocsUrl"), d.get("lastUpdated"))
+
+    def to_api(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "pricingUrl": self.pricing_url,
+            "apiDocsUrl": self.api_docs_url,
+            "lastUpdated": self.last_updated,
+        }
+
+
+class ModelRecord:
+    __slots__ = (
+        "id", "provider_id", "name", "api_id", "type", "modalities", "capabilities",
+        "context_length", "max_output_tokens", "deprecated", "deprecation_date",
+        "pricing", "self_hosted", "source_url", "last_updated",
+        "input_price", "output_price", "cache_price", "blended_price",
+    )
+
+    def __init__(
+        self, id, provider_id, name, api_id, type, modalities, capabilities,
+        context_length, max_output_tokens, deprecated, deprecation_date,
+        pricing, self_hosted, source_url, last_updated,
+    ) -> None:
+        self.id = id
+        self.provider_id = sys.intern(provider_id)
+        self.name = name
+        self.api_id = api_id
+        self.type = sys.intern(type)
+        self.modalities = _intern_all(modalities)
+        self.capabilities = _intern_all(capabilities)
+        self.context_length = context_length
+        self.max_output_tokens = max_output_tokens
+        self.deprecated = bool(deprecated)
+        self.deprecation_date = _iso(deprecation_date)
+        self.pricing = parse_jsonb(pricing) or {}
+        self.self_hosted = parse_jsonb(self_hosted)
+        self.source_url = _intern(source_url)
+        self.last_updated = _iso(last_updated)
+        self.input_price = _num(self.pricing.get("inputPerMillionTokens"))
+        self.output_price = _num(self.pricing.get("outputPerMillionTokens"))
+        self.cache_price = _num(self.pricing.get("cacheInputPerMillionTokens"))
+        # 3:1 input:output per million tokens (catalog_view.blended_price_3_1); rounded so
+        # float error doesn't break ties that are exact in NUMERIC.
+        self.blended_price = (
+            round((3 * self.input_price + self.output_price) / 4, 10)
+            if self.input_price is not None and self.output_price is not None
+            else None
+        )
+
+    @classmethod
+    def from_row(cls, row: asyncpg.Record) -> "ModelRecord":
+        return cls(
+            row["id"], row["provider_id"], row["name"], row["api_id"], row["type"],
+            row["modalities"], row["capabilities"], row["context_length"], row["max_output_tokens"],
+            row["deprecated"], row["deprecation_date"], row["pricing"], row["self_hosted"],
+            row["source_url"], row["last_updated"],
+        )
+
+    @classmethod
+    def from_api(cls, d: dict[str, Any]) -> "ModelRecord":
+        """Build from an API-shaped dict (scraper output / snapshot files)."""
+        return cls(
+            d["id"], d["providerId"], d["name"], d.get("apiId"), d["type"],
+            d.get("modalities"), d.get("capabilities"), d.get("contextLength"), d.get("maxOutputTokens"),
+            d.get("deprecated", False), d.get("deprecationDate"), d.get("pricing"), d.get("selfHosted"),
+            d.get("sourceUrl"), d.get("lastUpdated"),
+        )
+
+    def price(self, key: str) -> float | None:
+        """Numeric value of any pricing key."""
+        return _num(self.pricing.get(key))
+
+    def project(self, spec: FieldSpec) -> dict[str, Any]:
+        """Only the requested fields (see parse_fields)."""
+        return project(lambda column: api_value(column, getattr(self, column)), spec)
+
+    def to_api(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "providerId": self.provider_id,
+            "name": self.name,
+            "apiId": self.api_id,
+            "type": self.type,
+            "modalities": list(self.modalities),
+            "capabilities": list(self.capabilities),
+            "contextLength": self.context_length,
+            "maxOutputTokens": self.max_output_tokens,
+            "deprecated": self.deprecated,
+            "deprecationDate": self.deprecation_date,
+            "pricing": self.pricing,
+            "selfHosted": self.self_hosted,
+            "sourceUrl": self.source_url,
+            "lastUpdated": self.last_updated,
+        }
@@ -0,0 +1,276 @@
+"""
+Pre-serialized JSON responses with strong ETags.
+
+Catalog read bodies are encoded once per catalog version and kept as bytes;
+requests whose If-None-Match matches the ETag get a 304 without a body.
+
+Cached bodies are also compressed at most once per version and encoding
+(brotli when the optional `brotli` package is installed, else gzip) and
+served by Accept-Encoding, so compression costs no CPU on repeat requests.
+Each encoding has its own ETag, and responses carry Vary: Accept-Encoding.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Hashable
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+from fastapi import Request, Response
+
+from app.config import get_catalog_cache_enabled
+from app.metrics import compress_duration, response_cache_requests, serialize_duration
+from app.services.catalog import Catalog
+from app.services.db_service import get_catalog
+
+# Distinct query shapes kept per catalog version (LRU beyond this).
+MAX_ENTRIES = 512
+
+# Bodies smaller than this go out uncompressed (headers would eat the savings).
+MIN_COMPRESS_BYTES = 1024
+
+# Larger bodies are compressed in a worker thread so the event loop keeps serving.
+THREAD_COMPRESS_BYTES = 8 * 1024
+
+# Each body is compressed once per catalog version, so use (near) max settings.
+# Brotli 11 is ~100x slower than 9 (seconds on a multi-MB full list), so it is
+# kept for bodies up to BROTLI_MAX_QUALITY_BYTES.
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+BROTLI_LARGE_QUALITY = 9
+BROTLI_MAX_QUALITY_BYTES = 256 * 1024
+
+
+def _gzip(body: bytes) -> bytes:
+    # mtime=0 keeps the output (and its ETag) identical across processes.
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    quality = BROTLI_QUALITY if len(body) <= BROTLI_MAX_QUALITY_BYTES else BROTLI_LARGE_QUALITY
+    return brotli.compress(body, mode=brotli.MODE_TEXT, quality=quality)
+
+
+# Content codings in order of preference when a client accepts several equally.
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {"br": _brotli, "gzip": _gzip} if brotli else {"gzip": _gzip}
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode like Starlette's JSONResponse (compact, UTF-8)."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class Payload:
+    """Response content plus extra headers that are cached along with it."""
+
+    __slots__ = ("content", "headers")
+
+    def __init__(self, content: Any, headers: dict[str, str] | None = None) -> None:
+        self.content = content
+        self.headers = headers or {}
+
+
+class CachedBody:
+    """Encoded response body, its strong ETag, any extra headers and compressed variants."""
+
+    __slots__ = ("body", "etag", "headers", "kind", "_variants")
+
+    def __init__(self, body: bytes, headers: dict[str, str] | None = None, kind: str = "other") -> None:
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self.headers = headers or {}
+        self.kind = kind
+        # encoding -> (body, ETag), None (not worth compressing), or a Future while building
+        self._variants: dict[str, Any] = {}
+
+    async def variant(self, encoding: str) -> tuple[bytes, str] | None:
+        """(compressed body, ETag) for a content coding, built on first use; None if not worth it."""
+        if encoding in self._variants:
+            variant = self._variants[encoding]
+            if isinstance(variant, asyncio.Future):
+                # Another request is compressing; shield so our cancellation doesn't stop it.
+                variant = await asyncio.shield(variant)
+            return variant
+        if len(self.body) < MIN_COMPRESS_BYTES:
+            self._variants[encoding] = None
+            return None
+        if len(self.body) < THREAD_COMPRESS_BYTES:
+            variant, seconds = self._compress(encoding)
+            compress_duration.observe((self.kind, encoding), seconds)
+            self._variants[encoding] = variant
+            return variant
+        building = self._variants[encoding] = asyncio.ensure_future(self._compress_in_thread(encoding))
+        building.add_done_callback(lambda future: self._settle(encoding, future))
+        return await asyncio.shield(building)
+
+    async def _compress_in_thread(self, encoding: str) -> tuple[bytes, str] | None:
+        variant, seconds = await asyncio.to_thread(self._compress, encoding)
+        compress_duration.observe((self.kind, encoding), seconds)
+        return variant
+
+    def _settle(self, encoding: str, future: asyncio.Future) -> None:
+        """Keep a finished variant; drop a failed or cancelled build so the next request retries."""
+        if self._variants.get(encoding) is not future:
+            return
+        if future.cancelled() or future.exception() is not None:
+            del self._variants[encoding]
+        else:
+            self._variants[encoding] = future.result()
+
+    def _compress(self, encoding: str) -> tuple[tuple[bytes, str] | None, float]:
+        started = time.perf_counter()
+        compressed = COMPRESSORS[encoding](self.body)
+        seconds = time.perf_counter() - started
+        if len(compressed) >= len(self.body):
+            return None, seconds
+        return (compressed, f'{self.etag[:-1]}-{encoding}"'), seconds
+
+    @classmethod
+    def build(cls, content: Any, kind: str = "other") -> "CachedBody":
+        """Encode content (or a Payload) once; encoding time is recorded per `kind`."""
+        started = time.perf_counter()
+        if isinstance(content, Payload):
+            entry = cls(encode_json(content.content), content.headers, kind)
+        else:
+            entry = cls(encode_json(content), kind=kind)
+        serialize_duration.observe((kind,), time.perf_counter() - started)
+        return entry
+
+
+class ResponseCache:
+    """Encoded bodies keyed by query shape, dropped wholesale when the catalog version changes."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._version: Any = None
+        self._entries: OrderedDict[Hashable, CachedBody] = OrderedDict()
+
+    def get(self, version: Any, key: Hashable) -> CachedBody | None:
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def put(self, version: Any, key: Hashable, content: Any) -> CachedBody:
+        entry = CachedBody.build(content, _kind(key))
+        if version == self._version:
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+response_cache = ResponseCache()
+
+
+def _kind(key: Hashable) -> str:
+    """Metric label for a cache key: its leading name (e.g. "models")."""
+    if isinstance(key, tuple) and key and isinstance(key[0], str):
+        return key[0]
+    return "other"
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+@lru_cache(maxsize=64)
+def preferred_encoding(accept_encoding: str) -> str | None:
+    """Best available content coding the client accepts (None = identity).
+
+    Highest q-value wins; ties go to the earlier entry in COMPRESSORS.
+    """
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[coding.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in COMPRESSORS:
+        q = qualities.get(encoding, qualities.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+async def json_response(request: Request, entry: CachedBody, compress: bool = True) -> Response:
+    """200 with the cached body (compressed if accepted), or 304 when the client already has it."""
+    body, etag, encoding = entry.body, entry.etag, None
+    accept_encoding = request.headers.get("accept-encoding")
+    if compress and accept_encoding:
+        encoding = preferred_encoding(accept_encoding)
+        variant = await entry.variant(encoding) if encoding else None
+        if variant is None:
+            encoding = None
+        else:
+            body, etag = variant
+    headers = {**entry.headers, "ETag": etag, "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def cached_json(
+    request: Request,
+    key: Hashable,
+    build: Callable[[Catalog | None], Awaitable[Any]],
+) -> Response:
+    """Serve `build(catalog)` as JSON, encoding it at most once per catalog version.
+
+    `build` gets the catalog snapshot the cache key was taken from (None when the
+    catalog cache is off) and must read from it, so a refresh landing mid-build
+    can't store a newer body under the older version. It may return a Payload to
+    attach headers (e.g. pagination cursors).
+    """
+    kind = _kind(key)
+    if not get_catalog_cache_enabled():
+        response_cache_requests.inc((kind, "uncached"))
+        # Built per request, so compressing would cost CPU every time.
+        return await json_response(request, CachedBody.build(await build(None), kind), compress=False)
+    catalog = await get_catalog()
+    entry = response_cache.get(catalog.version, key)
+    if entry is None:
+        response_cache_requests.inc((kind, "miss"))
+        entry = response_cache.put(catalog.version, key, await build(catalog))
+    else:
+        response_cache_requests.inc((kind, "hit"))
+    return await json_response(request, entry)
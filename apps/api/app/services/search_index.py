@@ -0,0 +1,157 @@
+"""
+Model search — in-process trigram index.
+
+Indexes name, api_id, provider name and capabilities with pg_trgm-style
+trigrams (each word padded "  word "). A query scores each field by how much
+of the query's trigrams it contains (typo-tolerant) blended with trigram
+similarity, plus bonuses for exact and prefix matches.
+
+Built once per catalog version. Trigram sets are cached by field text and
+carried over from the previous index, so a rebuild after a scrape only
+tokenizes the fields that actually changed.
+"""
+import re
+from collections import defaultdict
+from typing import Any
+
+from app.services.catalog import Catalog
+
+# Field weights: matches on name / api id rank above provider or capability matches.
+FIELDS = ("name", "api_id", "provider", "capabilities")
+FIELD_WEIGHTS = (1.0, 1.0, 0.6, 0.5)
+
+# Minimum share of query trigrams a field must contain to count as a match.
+MIN_CONTAINMENT = 0.5
+
+_NON_WORD = re.compile(r"[^0-9a-z.]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase; separators (space, -, _, /) collapse to single spaces."""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str) -> frozenset[str]:
+    """pg_trgm-style trigrams of every word in normalized text."""
+    grams = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class SearchIndex:
+    """Trigram postings over the searchable fields of one catalog snapshot."""
+
+    def __init__(self, catalog: Catalog, previous: "SearchIndex | None" = None) -> None:
+        self.catalog = catalog
+        provider_names = {p.id: p.name for p in catalog.providers}
+        # Carry tokenization over from the previous version; only new texts are tokenized.
+        known = previous.grams_by_text if previous else {}
+        self.grams_by_text: dict[str, frozenset[str]] = {}
+        self.texts: list[tuple[str, ...]] = []
+        self.field_grams: list[tuple[frozenset[str], ...]] = []
+        self.postings: dict[str, list[int]] = defaultdict(list)
+
+        for doc, m in enumerate(catalog.models):
+            texts = (
+                normalize(m.name),
+                normalize(m.api_id or ""),
+                normalize(provider_names.get(m.provider_id, m.provider_id)),
+                normalize(" ".join(m.capabilities).replace("_", " ")),
+            )
+            grams = []
+            for field, text in enumerate(texts):
+                g = self.grams_by_text.get(text)
+                if g is None:
+                    g = known.get(text)
+                    if g is None:
+                        g = trigrams(text)
+                    self.grams_by_text[text] = g
+                grams.append(g)
+                for gram in g:
+                    self.postings[gram].append(doc * len(FIELDS) + field)
+            self.texts.append(texts)
+            self.field_grams.append(tuple(grams))
+
+    def search(self, query: str, mask: int | None = None, limit: int = 20) -> list[tuple[float, int]]:
+        """Ranked (score, model position) pairs; `mask` is a CatalogIndex bitset filter."""
+        q = normalize(query)
+        q_grams = trigrams(q)
+        if not q_grams:
+            return []
+        shared: dict[int, int] = defaultdict(int)
+        for gram in q_grams:
+            for posting in self.postings.get(gram, ()):
+                shared[posting] += 1
+
+        bits = mask.to_bytes((len(self.texts) + 7) // 8, "little") if mask is not None else None
+        n_fields = len(FIELDS)
+        best: dict[int, float] = {}
+        for posting, count in shared.items():
+            containment = count / len(q_grams)
+            if containment < MIN_CONTAINMENT:
+                continue
+            doc, field = divmod(posting, n_fields)
+            if bits is not None and not bits[doc >> 3] >> (doc & 7) & 1:
+                continue
+            field_grams = self.field_grams[doc][field]
+            similarity = count / (len(q_grams) + len(field_grams) - count)
+            score = 0.7 * containment + 0.3 * similarity
+            text = self.texts[doc][field]
+            if text == q:
+                score += 1.0
+            elif text.startswith(q) or f" {q}" in f" {text}":
+                score += 0.5
+            score *= FIELD_WEIGHTS[field]
+            if score > best.get(doc, 0.0):
+                best[doc] = score
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1], self.catalog.models[item[0]].id))
+        return [(score, doc) for doc, score in ranked[:limit]]
+
+
+_last_index: SearchIndex | None = None
+
+
+def get_search_index(catalog: Catalog) -> SearchIndex:
+    """Search index for a snapshot, built incrementally from the previous one on first use."""
+    global _last_index
+
+    def build(c: Catalog) -> SearchIndex:
+        return SearchIndex(c, previous=_last_index)
+
+    index = catalog.derived("search_index", build)
+    _last_index = index
+    return index
+
+
+def search_models(
+    catalog: Catalog,
+    query: str,
+    provider_id: str | None = None,
+    capability: str | None = None,
+    model_type: str | None = None,
+    include_deprecated: bool = False,
+    limit: int = 20,
+) -> list[dict[str, Any]]:
+    """Search the catalog; results carry a relevance score, best first."""
+    mask = catalog.index.mask(
+        provider_id=provider_id,
+        capability=capability,
+        model_type=model_type,
+        include_deprecated=include_deprecated,
+    )
+    results = []
+    for score, doc in get_search_index(catalog).search(query, mask, limit):
+        m = catalog.models[doc]
+        results.append({
+            "id": m.id,
+            "providerId": m.provider_id,
+            "name": m.name,
+            "apiId": m.api_id,
+            "type": m.type,
+            "capabilities": list(m.capabilities),
+            "score": round(score, 4),
+        })
+    return results
@@ -0,0 +1,170 @@
+"""
+Catalog snapshot files — the whole catalog in one compact binary file.
+
+Written by the scrape job (CATALOG_SNAPSHOT_PATH) from the published
+catalog, read by the API to boot without waiting on Postgres, or to run with
+no database at all (CATALOG_SNAPSHOT_ONLY).
+
+Layout: MAGIC, a uint32 header length, a msgpack header
+{format, version, contentHash, createdAt, providers, models} and a msgpack
+body. `version` is the database version the file was written from;
+`contentHash` (BLAKE2b of the body) is what writers and snapshot-only readers
+compare, so any change to the data — however the database version probe
+sees it — produces a new file and a reload. The body
+stores providers and models as rows in a fixed field order (no per-record
+keys) plus the CatalogIndex sort orders, so loading skips sorting. The file
+is read through mmap and the body unpacked straight from the mapping;
+`snapshot_version()` reads only the header, so checking for a new file is cheap.
+Files are replaced atomically (write + rename), never modified in place.
+"""
+import hashlib
+import mmap
+import os
+import struct
+from datetime import datetime, timezone
+from typing import Any
+
+import msgpack
+
+from app.services.catalog import Catalog
+from app.services.catalog_index import SORT_KEYS
+from app.services.records import ModelRecord, ProviderRecord
+
+MAGIC = b"AMSCAT\x00\x01"
+# Bump when the header/body layout changes; readers reject other formats.
+SNAPSHOT_FORMAT = 2
+
+_HEADER_LENGTH = struct.Struct("<I")
+_PREFIX_SIZE = len(MAGIC) + _HEADER_LENGTH.size
+
+# Row layouts (ModelRecord.to_api keys). Readers map rows by the field list stored in the
+# file, so fields can be added without a format bump.
+PROVIDER_FIELDS = ("id", "name", "pricingUrl", "apiDocsUrl", "lastUpdated")
+MODEL_FIELDS = (
+    "id", "providerId", "name", "apiId", "type", "modalities", "capabilities",
+    "contextLength", "maxOutputTokens", "deprecated", "deprecationDate",
+    "pricing", "selfHosted", "sourceUrl", "lastUpdated",
+)
+
+
+def _pack(obj: Any) -> bytes:
+    # datetime=True: catalog versions hold timestamptz values (msgpack Timestamp extension).
+    return msgpack.packb(obj, use_bin_type=True, datetime=True)
+
+
+def _unpack(data) -> Any:
+    return msgpack.unpackb(data, raw=False, timestamp=3, strict_map_key=False)
+
+
+def encode_snapshot(catalog: Catalog) -> bytes:
+    body = _encode_body(catalog)
+    header = _pack({
+        "format": SNAPSHOT_FORMAT,
+        "version": list(catalog.version),
+        "contentHash": _content_hash(body),
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "providers": len(catalog.providers),
+        "models": len(catalog.models),
+    })
+    return MAGIC + _HEADER_LENGTH.pack(len(header)) + header + body
+
+
+def _content_hash(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _encode_body(catalog: Catalog) -> bytes:
+    """Rows and sort orders only (no timestamps), so equal catalogs encode to equal bytes."""
+    provider_rows = []
+    for p in catalog.providers:
+        d = p.to_api()
+        provider_rows.append([d[f] for f in PROVIDER_FIELDS])
+    model_rows = []
+    for m in catalog.models:
+        d = m.to_api()
+        model_rows.append([d[f] for f in MODEL_FIELDS])
+    body = _pack({
+        "providerFields": list(PROVIDER_FIELDS),
+        "providers": provider_rows,
+        "modelFields": list(MODEL_FIELDS),
+        "models": model_rows,
+        "orders": {
+            f"{key}:{'desc' if descending else 'asc'}": order
+            for (key, descending), order in catalog.index.orders.items()
+        },
+    })
+    return body
+
+
+def write_snapshot(catalog: Catalog, path: str) -> int | None:
+    """Atomically write `catalog` to `path`; returns the file size in bytes.
+
+    Returns None without writing when the file already holds the same content.
+    """
+    data = encode_snapshot(catalog)
+    header, _ = _read_header(data)
+    try:
+        if snapshot_version(path) == header["contentHash"]:
+            return None
+    except ValueError:
+        pass  # unreadable / older format: overwrite
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(data)
+
+
+def _read_header(buf) -> tuple[dict[str, Any], int]:
+    """(header, body offset); ValueError if this isn't a snapshot we can read."""
+    if bytes(buf[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a catalog snapshot file")
+    (length,) = _HEADER_LENGTH.unpack(bytes(buf[len(MAGIC):_PREFIX_SIZE]))
+    header = _unpack(bytes(buf[_PREFIX_SIZE:_PREFIX_SIZE + length]))
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported catalog snapshot format {header.get('format')!r}")
+    return header, _PREFIX_SIZE + length
+
+
+def snapshot_version(path: str) -> str | None:
+    """Content hash of the snapshot at `path` (header only), or None if missing."""
+    try:
+        with open(path, "rb") as f:
+            prefix = f.read(_PREFIX_SIZE)
+            if len(prefix) < _PREFIX_SIZE:
+                raise ValueError("Truncated catalog snapshot file")
+            (length,) = _HEADER_LENGTH.unpack(prefix[len(MAGIC):])
+            header, _ = _read_header(prefix + f.read(length))
+    except FileNotFoundError:
+        return None
+    return header["contentHash"]
+
+
+def read_snapshot(path: str, content_version: bool = False) -> Catalog:
+    """Load a Catalog from the snapshot at `path` (memory-mapped).
+
+    Its version is the database version the file was written from, or with
+    `content_version` the file's content hash (as snapshot_version() returns).
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        header, offset = _read_header(mapped)
+        with memoryview(mapped) as view:
+            body = _unpack(view[offset:])
+    providers = [ProviderRecord.from_api(dict(zip(body["providerFields"], row))) for row in body["providers"]]
+    if tuple(body["modelFields"]) == MODEL_FIELDS:
+        # MODEL_FIELDS follows ModelRecord's constructor order: build positionally, no per-row dict.
+        models = [ModelRecord(*row) for row in body["models"]]
+    else:
+        models = [ModelRecord.from_api(dict(zip(body["modelFields"], row))) for row in body["models"]]
+    orders = {}
+    for name, order in body.get("orders", {}).items():
+        key, _, direction = name.partition(":")
+        orders[(key, direction == "desc")] = order
+    # Orders from a build with different sort keys are rebuilt rather than trusted.
+    expected = {(key, descending) for key in SORT_KEYS for descending in (False, True)}
+    if set(orders) != expected or any(len(o) != len(models) for o in orders.values()):
+        orders = None
+    version = header["contentHash"] if content_version else tuple(header["version"])
+    return Catalog(version, providers, models, orders)
@@ -1,9 +1,107 @@
 """Upsert providers and models to PostgreSQL."""
+import hashlib
 import json
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import date, datetime
 from typing import Any
 
-from app.db import get_pool
+import asyncpg
+
+from app.db import CATALOG_VERSION_CHANNEL, acquire
+
+# Column order for staged model rows (matches _model_record)
+MODEL_COLUMNS = (
+    "id", "provider_id", "name", "api_id", "type", "modalities", "capabilities",
+    "context_length", "max_output_tokens", "deprecated", "deprecation_date",
+    "pricing", "self_hosted", "source_url", "last_updated", "content_hash",
+)
+
+# Record fields covered by content hashes (lastUpdated excluded: it changes every run)
+PROVIDER_HASH_FIELDS = ("id", "name", "pricingUrl", "apiDocsUrl")
+MODEL_HASH_FIELDS = (
+    "id", "providerId", "name", "apiId", "type", "modalities", "capabilities",
+    "contextLength", "maxOutputTokens", "deprecated", "deprecationDate",
+    "pricing", "selfHosted", "sourceUrl",
+)
+
+UPSERT_PROVIDER_SQL = """
+INSERT INTO providers (id, name, pricing_url, api_docs_url, last_updated, content_hash)
+VALUES ($1, $2, $3, $4, $5::timestamptz, $6)
+ON CONFLICT (id) DO UPDATE SET
+    name = EXCLUDED.name,
+    pricing_url = EXCLUDED.pricing_url,
+    api_docs_url = EXCLUDED.api_docs_url,
+    last_updated = EXCLUDED.last_updated,
+    content_hash = EXCLUDED.content_hash
+"""
+
+_MODEL_CONFLICT_UPDATE = """
+ON CONFLICT (id) DO UPDATE SET
+    name = EXCLUDED.name,
+    api_id = EXCLUDED.api_id,
+    type = EXCLUDED.type,
+    modalities = EXCLUDED.modalities,
+    capabilities = EXCLUDED.capabilities,
+    context_length = EXCLUDED.context_length,
+    max_output_tokens = EXCLUDED.max_output_tokens,
+    deprecated = EXCLUDED.deprecated,
+    deprecation_date = EXCLUDED.deprecation_date,
+    pricing = EXCLUDED.pricing,
+    self_hosted = EXCLUDED.self_hosted,
+    source_url = EXCLUDED.source_url,
+    last_updated = EXCLUDED.last_updated,
+    content_hash = EXCLUDED.content_hash
+"""
+
+UPSERT_MODEL_SQL = """
+INSERT INTO models (
+    id, provider_id, name, api_id, type, modalities, capabilities,
+    context_length, max_output_tokens, deprecated, deprecation_date,
+    pricing, self_hosted, source_url, last_updated, content_hash
+) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11::date, $12, $13, $14, $15::timestamptz, $16)
+""" + _MODEL_CONFLICT_UPDATE
+
+# Staging table for bulk upserts; dropped when the transaction commits.
+CREATE_MODEL_STAGE_SQL = """
+CREATE TEMP TABLE _models_stage (LIKE models INCLUDING DEFAULTS) ON COMMIT DROP
+"""
+
+_COLUMN_LIST = ", ".join(MODEL_COLUMNS)
+
+# Staged models that are new or whose pricing differs from the stored row (run before the merge)
+PRICING_CHANGED_SQL = """
+SELECT s.id FROM _models_stage s
+LEFT JOIN models m ON m.id = s.id
+WHERE m.id IS NULL OR m.pricing IS DISTINCT FROM s.pricing
+"""
+
+APPEND_PRICE_HISTORY_SQL = """
+INSERT INTO price_history (model_id, date, pricing, source)
+SELECT id, current_date, pricing, 'scrape' FROM _models_stage
+WHERE id = ANY($1::varchar[])
+"""
+
+MERGE_MODEL_STAGE_SQL = f"""
+INSERT INTO models ({_COLUMN_LIST})
+SELECT {_COLUMN_LIST} FROM _models_stage
+""" + _MODEL_CONFLICT_UPDATE
+
+# API read model (migration 007); CONCURRENTLY keeps reads unblocked during the refresh.
+REFRESH_CATALOG_VIEW_SQL = "REFRESH MATERIALIZED VIEW CONCURRENTLY catalog_view"
+
+# True when catalog_view no longer matches models/providers: a run that wrote rows but died (or
+# failed to refresh) before publishing leaves it stale, and the next run may write nothing.
+CATALOG_VIEW_STALE_SQL = """
+SELECT
+  (SELECT md5(string_agg(m.id || ':' || coalesce(m.content_hash, '') || ':' || p.name, ',' ORDER BY m.id))
+   FROM models m JOIN providers p ON p.id = m.provider_id)
+  IS DISTINCT FROM
+  (SELECT md5(string_agg(id || ':' || coalesce(content_hash, '') || ':' || provider_name, ',' ORDER BY id))
+   FROM catalog_view)
+"""
+
+# Tells API processes (LISTEN in app.db) to reload; delivered when the transaction commits.
+NOTIFY_CATALOG_VERSION_SQL = "SELECT pg_notify($1, '')"
 
 
 def _parse_ts(value: str | datetime) -> datetime:
@@ -13,67 +111,161 @@ def _parse_ts(value: str | datetime) -> datetime:
     return datetime.fromisoformat(value.replace("Z", "+00:00"))
 
 
+def _parse_date(value: str | date | None) -> date | None:
+    """Parse deprecationDate (YYYY-MM-DD) to date for asyncpg."""
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def content_hash(record: dict[str, Any], fields: tuple[str, ...]) -> str:
+    """SHA-256 over the canonical JSON of the given record fields."""
+    canonical = json.dumps(
+        {f: record.get(f) for f in fields},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class UpsertStats:
+    """Outcome of a provider upsert. `removed` models are reported, not deleted."""
+
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    provider_changed: bool = False
+
+    @property
+    def written(self) -> int:
+        return self.added + self.changed
+
+    @property
+    def any_changes(self) -> bool:
+        return self.provider_changed or self.written > 0
+
+
+def _provider_args(provider: dict[str, Any]) -> tuple:
+    return (
+        provider["id"],
+        provider["name"],
+        provider["pricingUrl"],
+        provider.get("apiDocsUrl"),
+        _parse_ts(provider["lastUpdated"]),
+        content_hash(provider, PROVIDER_HASH_FIELDS),
+    )
+
+
+def _model_record(model: dict[str, Any]) -> tuple:
+    """Model dict → row tuple in MODEL_COLUMNS order."""
+    return (
+        model["id"],
+        model["providerId"],
+        model["name"],
+        model.get("apiId"),
+        model["type"],
+        model["modalities"],
+        model["capabilities"],
+        model.get("contextLength"),
+        model.get("maxOutputTokens"),
+        model.get("deprecated", False),
+        _parse_date(model.get("deprecationDate")),
+        json.dumps(model["pricing"]),
+        json.dumps(model["selfHosted"]) if model.get("selfHosted") else None,
+        model["sourceUrl"],
+        _parse_ts(model["lastUpdated"]),
+        content_hash(model, MODEL_HASH_FIELDS),
+    )
+
+
 async def upsert_provider(provider: dict[str, Any]) -> None:
     """Upsert provider."""
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            INSERT INTO providers (id, name, pricing_url, api_docs_url, last_updated)
-            VALUES ($1, $2, $3, $4, $5::timestamptz)
-            ON CONFLICT (id) DO UPDATE SET
-                name = EXCLUDED.name,
-                pricing_url = EXCLUDED.pricing_url,
-                api_docs_url = EXCLUDED.api_docs_url,
-                last_updated = EXCLUDED.last_updated
-            """,
-            provider["id"],
-            provider["name"],
-            provider["pricingUrl"],
-            provider.get("apiDocsUrl"),
-            _parse_ts(provider["lastUpdated"]),
-        )
+    async with acquire() as conn:
+        await conn.execute(UPSERT_PROVIDER_SQL, *_provider_args(provider))
 
 
 async def upsert_model(model: dict[str, Any]) -> None:
     """Upsert model."""
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            INSERT INTO models (
-                id, provider_id, name, api_id, type, modalities, capabilities,
-                context_length, max_output_tokens, deprecated, deprecation_date,
-                pricing, self_hosted, source_url, last_updated
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11::date, $12, $13, $14, $15::timestamptz)
-            ON CONFLICT (id) DO UPDATE SET
-                name = EXCLUDED.name,
-                api_id = EXCLUDED.api_id,
-                type = EXCLUDED.type,
-                modalities = EXCLUDED.modalities,
-                capabilities = EXCLUDED.capabilities,
-                context_length = EXCLUDED.context_length,
-                max_output_tokens = EXCLUDED.max_output_tokens,
-                deprecated = EXCLUDED.deprecated,
-                deprecation_date = EXCLUDED.deprecation_date,
-                pricing = EXCLUDED.pricing,
-                self_hosted = EXCLUDED.self_hosted,
-                source_url = EXCLUDED.source_url,
-                last_updated = EXCLUDED.last_updated
-            """,
-            model["id"],
-            model["providerId"],
-            model["name"],
-            model.get("apiId"),
-            model["type"],
-            model["modalities"],
-            model["capabilities"],
-            model.get("contextLength"),
-            model.get("maxOutputTokens"),
-            model.get("deprecated", False),
-            model.get("deprecationDate"),
-            json.dumps(model["pricing"]),
-            json.dumps(model["selfHosted"]) if model.get("selfHosted") else None,
-            model["sourceUrl"],
-            _parse_ts(model["lastUpdated"]),
-        )
+    async with acquire() as conn:
+        await conn.execute(UPSERT_MODEL_SQL, *_model_record(model))
+
+
+async def _stage_and_merge(conn: asyncpg.Connection, records: list[tuple]) -> None:
+    """COPY model records into a temp table and merge them into `models` in one statement.
+
+    Models whose pricing is new or changed get a price_history row.
+    """
+    await conn.execute(CREATE_MODEL_STAGE_SQL)
+    await conn.copy_records_to_table("_models_stage", records=records, columns=MODEL_COLUMNS)
+    pricing_changed = [r["id"] for r in await conn.fetch(PRICING_CHANGED_SQL)]
+    await conn.execute(MERGE_MODEL_STAGE_SQL)
+    if pricing_changed:
+        # After the merge, so new models satisfy the price_history FK.
+        await conn.execute(APPEND_PRICE_HISTORY_SQL, pricing_changed)
+
+
+async def upsert_provider_models(provider: dict[str, Any], models: list[dict[str, Any]]) -> UpsertStats:
+    """Upsert a provider and all of its models in a single transaction.
+
+    Only rows whose content hash differs from the stored one are written, so
+    unchanged models keep their last_updated. Readers see either the previous
+    or the new state of the provider, never a mix.
+    """
+    # De-duplicate by id (last wins): ON CONFLICT cannot touch a row twice.
+    records = {m["id"]: _model_record(m) for m in models}
+    provider_args = _provider_args(provider)
+    stats = UpsertStats()
+
+    async with acquire() as conn:
+        async with conn.transaction():
+            stored_provider_hash = await conn.fetchval(
+                "SELECT content_hash FROM providers WHERE id = $1", provider["id"]
+            )
+            if stored_provider_hash != provider_args[-1]:
+                await conn.execute(UPSERT_PROVIDER_SQL, *provider_args)
+                stats.provider_changed = True
+
+            stored = {
+                r["id"]: r["content_hash"]
+                for r in await conn.fetch(
+                    "SELECT id, content_hash FROM models WHERE provider_id = $1", provider["id"]
+                )
+            }
+            pending = []
+            for model_id, record in records.items():
+                if model_id not in stored:
+                    stats.added += 1
+                elif stored[model_id] != record[-1]:
+                    stats.changed += 1
+                else:
+                    stats.unchanged += 1
+                    continue
+                pending.append(record)
+            stats.removed = len(stored.keys() - records.keys())
+
+            if pending:
+                await _stage_and_merge(conn, pending)
+    return stats
+
+
+async def publish_catalog(conn: asyncpg.Connection) -> None:
+    """Refresh catalog_view and notify API processes once it is committed."""
+    async with conn.transaction():
+        await conn.execute(REFRESH_CATALOG_VIEW_SQL)
+        await conn.execute(NOTIFY_CATALOG_VERSION_SQL, CATALOG_VERSION_CHANNEL)
+
+
+async def refresh_catalog_view(force: bool = False) -> bool:
+    """Rebuild catalog_view from models/providers and notify the API; call once after a batch of upserts.
+
+    Skipped (returns False) unless `force` or the view is stale, so every run can call it:
+    changes a previous run wrote but never published are published by the next one.
+    """
+    async with acquire() as conn:
+        if not force and not await conn.fetchval(CATALOG_VIEW_STALE_SQL):
+            return False
+        await publish_catalog(conn)
+    return True
@@ -0,0 +1,115 @@
+"""
+Startup warm-up and readiness.
+
+The lifespan starts `warm_up()` in the background so the server listens
+immediately; GET /health answers 503 until it finishes. Warm-up installs the
+catalog from CATALOG_SNAPSHOT_PATH when there is one, opens the pool (unless
+CATALOG_SNAPSHOT_ONLY), loads / version-checks the catalog and requests STARTUP_WARM_PATHS through the
+app in-process, so by the time the instance reports ready the first real
+requests hit warm connections, a loaded snapshot and encoded (and
+compressed) response bodies. Warm-up requests carry WARMUP_SCOPE_KEY, so they
+use no rate-limit tokens and don't count as traffic in request metrics.
+Failures are logged and the instance still becomes ready: anything not
+warmed is then built on first use, as before.
+"""
+import asyncio
+import logging
+import time
+
+from app.config import (
+    get_catalog_cache_enabled,
+    get_catalog_snapshot_only,
+    get_catalog_snapshot_path,
+    get_warmup_paths,
+)
+from app.db import warm_pool
+from app.metrics import WARMUP_SCOPE_KEY
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Warm-up state reported by /health."""
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.warmup_seconds: float | None = None
+
+
+readiness = Readiness()
+
+
+async def warm_up(app) -> None:
+    started = time.perf_counter()
+    try:
+        await _warm(app)
+    finally:
+        readiness.warmup_seconds = round(time.perf_counter() - started, 3)
+        readiness.ready = True
+        logger.info("Warm-up finished in %.3fs", readiness.warmup_seconds)
+
+
+async def _boot_from_snapshot(path: str) -> None:
+    """Install the catalog from the snapshot file before Postgres is reached (version-checked later)."""
+    from app.services.catalog import catalog_store
+    from app.services.snapshot import read_snapshot
+
+    try:
+        catalog_store.set(await asyncio.to_thread(read_snapshot, path))
+    except FileNotFoundError:
+        logger.info("No catalog snapshot at %s, loading from the database", path)
+    except Exception as e:
+        logger.warning("Catalog snapshot %s unreadable, loading from the database: %s", path, e)
+
+
+def _warmup_app(app):
+    """`app` with every request marked as warm-up (see WARMUP_SCOPE_KEY)."""
+    async def marked(scope, receive, send):
+        await app({**scope, WARMUP_SCOPE_KEY: True}, receive, send)
+
+    return marked
+
+
+async def _warm(app) -> None:
+    from app.services.catalog import catalog_store
+
+    snapshot_only = get_catalog_snapshot_only()
+    if get_catalog_cache_enabled() and get_catalog_snapshot_path() and not snapshot_only:
+        await _boot_from_snapshot(get_catalog_snapshot_path())
+    if not snapshot_only:
+        try:
+            # Connect before taking traffic so the first requests don't pay for it (Cloud Run cold starts).
+            await warm_pool()
+        except Exception as e:
+            logger.warning("Pool warm-up failed, connecting on first use: %s", e)
+            if catalog_store.snapshot is None:
+                return
+    if get_catalog_cache_enabled():
+        from app.services.db_service import get_catalog
+
+        try:
+            await get_catalog()
+        except Exception as e:
+            logger.warning("Catalog warm-up failed, loading on first request: %s", e)
+            if catalog_store.snapshot is None:
+                return
+    paths = get_warmup_paths()
+    if not paths:
+        return
+    import httpx
+
+    from app.services.response_cache import COMPRESSORS
+
+    # One request per encoding, so each compressed variant is built now rather than on first use.
+    transport = httpx.ASGITransport(app=_warmup_app(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        for path in paths:
+            for encoding in COMPRESSORS:
+                try:
+                    response = await client.get(path, headers={"Accept-Encoding": encoding})
+                except Exception as e:
+                    logger.warning("Warm-up request %s failed: %s", path, e)
+                    break
+                if response.status_code >= 400:
+                    logger.warning("Warm-up request %s returned %d", path, response.status_code)
+                    break
@@ -0,0 +1,3 @@
+-- Content hashes for change detection (scrape pipeline only rewrites rows whose hash changed)
+ALTER TABLE providers ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE models ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
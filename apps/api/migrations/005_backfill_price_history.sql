@@ -0,0 +1,6 @@
+-- Seed price_history with the current pricing of models that have no history yet.
+-- From here on the scrape job appends a row only when a model's pricing changes.
+INSERT INTO price_history (model_id, date, pricing, source)
+SELECT m.id, m.last_updated::date, m.pricing, 'backfill'
+FROM models m
+WHERE NOT EXISTS (SELECT 1 FROM price_history h WHERE h.model_id = m.id);
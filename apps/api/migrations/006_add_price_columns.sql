@@ -0,0 +1,14 @@
+-- Numeric sort prices derived from pricing JSONB (kept in sync by Postgres).
+-- Non-numeric values (e.g. "" or text) become NULL instead of failing the write.
+ALTER TABLE models ADD COLUMN IF NOT EXISTS input_price NUMERIC GENERATED ALWAYS AS (
+  CASE WHEN pricing->>'inputPerMillionTokens' ~ '^-?[0-9]+(\.[0-9]*)?([eE][-+]?[0-9]+)?$'
+       THEN (pricing->>'inputPerMillionTokens')::numeric END
+) STORED;
+ALTER TABLE models ADD COLUMN IF NOT EXISTS output_price NUMERIC GENERATED ALWAYS AS (
+  CASE WHEN pricing->>'outputPerMillionTokens' ~ '^-?[0-9]+(\.[0-9]*)?([eE][-+]?[0-9]+)?$'
+       THEN (pricing->>'outputPerMillionTokens')::numeric END
+) STORED;
+ALTER TABLE models ADD COLUMN IF NOT EXISTS cache_price NUMERIC GENERATED ALWAYS AS (
+  CASE WHEN pricing->>'cacheInputPerMillionTokens' ~ '^-?[0-9]+(\.[0-9]*)?([eE][-+]?[0-9]+)?$'
+       THEN (pricing->>'cacheInputPerMillionTokens')::numeric END
+) STORED;
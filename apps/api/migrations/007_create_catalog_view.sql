@@ -0,0 +1,64 @@
+-- Read model for the API: models joined to their provider, prices flattened to numeric
+-- columns and blended input:output prices precomputed. Refreshed CONCURRENTLY by the
+-- scrape and seed jobs after they write, so writes never block reads.
+CREATE MATERIALIZED VIEW IF NOT EXISTS catalog_view AS
+SELECT
+  m.id,
+  m.provider_id,
+  p.name AS provider_name,
+  m.name,
+  m.api_id,
+  m.type,
+  m.modalities,
+  m.capabilities,
+  m.context_length,
+  m.max_output_tokens,
+  m.deprecated,
+  m.deprecation_date,
+  m.pricing,
+  m.self_hosted,
+  m.source_url,
+  m.last_updated,
+  m.content_hash,
+  m.input_price,
+  m.output_price,
+  m.cache_price,
+  CASE WHEN m.pricing->>'batchInputPerMillionTokens' ~ '^-?[0-9]+(\.[0-9]*)?([eE][-+]?[0-9]+)?$'
+       THEN (m.pricing->>'batchInputPerMillionTokens')::numeric END AS batch_input_price,
+  CASE WHEN m.pricing->>'batchOutputPerMillionTokens' ~ '^-?[0-9]+(\.[0-9]*)?([eE][-+]?[0-9]+)?$'
+       THEN (m.pricing->>'batchOutputPerMillionTokens')::numeric END AS batch_output_price,
+  -- Per million tokens for 3:1 (chat) and 1:1 input:output workloads
+  (3 * m.input_price + m.output_price) / 4 AS blended_price_3_1,
+  (m.input_price + m.output_price) / 2 AS blended_price_1_1
+FROM models m
+JOIN providers p ON p.id = m.provider_id;
+
+-- Required for REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_catalog_view_id ON catalog_view (id);
+
+-- Sort indexes for /api/models pages: partial (active models) and keyed exactly like each ORDER BY
+-- (sort column, NULLS LAST, then id), so sorted pages are index scans with no Sort step.
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_input_asc
+  ON catalog_view (input_price ASC NULLS LAST, id ASC) WHERE deprecated = false;
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_input_desc
+  ON catalog_view (input_price DESC NULLS LAST, id DESC) WHERE deprecated = false;
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_output_asc
+  ON catalog_view (output_price ASC NULLS LAST, id ASC) WHERE deprecated = false;
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_output_desc
+  ON catalog_view (output_price DESC NULLS LAST, id DESC) WHERE deprecated = false;
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_cache_asc
+  ON catalog_view (cache_price ASC NULLS LAST, id ASC) WHERE deprecated = false;
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_cache_desc
+  ON catalog_view (cache_price DESC NULLS LAST, id DESC) WHERE deprecated = false;
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_blended_asc
+  ON catalog_view (blended_price_3_1 ASC NULLS LAST, id ASC) WHERE deprecated = false;
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_blended_desc
+  ON catalog_view (blended_price_3_1 DESC NULLS LAST, id DESC) WHERE deprecated = false;
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_context_asc
+  ON catalog_view (context_length ASC NULLS LAST, id ASC) WHERE deprecated = false;
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_context_desc
+  ON catalog_view (context_length DESC NULLS LAST, id DESC) WHERE deprecated = false;
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_provider
+  ON catalog_view (provider_id, name, id) WHERE deprecated = false;
+CREATE INDEX IF NOT EXISTS idx_catalog_view_active_name
+  ON catalog_view (name, id) WHERE deprecated = false;
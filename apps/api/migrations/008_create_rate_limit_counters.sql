@@ -0,0 +1,8 @@
+-- Fleet-wide rate limit counters (RATE_LIMIT_BACKEND=postgres): hits per client key per rate period.
+-- UNLOGGED: no WAL on every sync; a crash only resets the current period's counts.
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_counters (
+  key VARCHAR(255) NOT NULL,
+  window_id BIGINT NOT NULL,
+  hits BIGINT NOT NULL,
+  PRIMARY KEY (key, window_id)
+);
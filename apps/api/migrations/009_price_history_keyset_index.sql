@@ -0,0 +1,20 @@
+-- migrate:no-transaction
+-- History pages and exports are ordered and keyset-paginated on (model_id, date, id); an index on
+-- (model_id, date) alone leaves the id tiebreak to a Sort per page. Replace it with one keyed on all three
+-- columns (same prefix, so it serves every query the old one did). Built CONCURRENTLY so scrape writes and
+-- history reads are not blocked during deploy.
+
+-- A failed concurrent build leaves an INVALID index behind that IF NOT EXISTS would keep; drop it first.
+DO $$
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = 'idx_price_history_model_date_id' AND NOT i.indisvalid
+  ) THEN
+    DROP INDEX idx_price_history_model_date_id;
+  END IF;
+END
+$$;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_price_history_model_date_id ON price_history (model_id, date, id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_price_history_model_date;
@@ -0,0 +1,147 @@
+"""In-memory catalog queries: presorted orders, filter bitsets and keyset cursors vs plain sorted()."""
+import asyncio
+import random
+
+import pytest
+
+from app.services.catalog import Catalog
+from app.services.catalog_index import SORT_KEYS, sort_value
+from app.services.cursors import decode_cursor, encode_cursor
+from app.services.db_service import get_models_page
+from app.services.records import ModelRecord
+
+PROVIDERS = ("anthropic", "google", "mistral", "openai")
+CAPABILITIES = ("coding", "rag", "vision")
+# Few distinct values so sorts have plenty of ties (broken by id) and NULL tails.
+PRICES = (None, 0.1, 0.5, 0.5, 2, 15)
+
+
+def _models(count: int = 60, seed: int = 7) -> list[ModelRecord]:
+    rng = random.Random(seed)
+    models = []
+    for i in range(count):
+        pricing = {}
+        for key in ("inputPerMillionTokens", "outputPerMillionTokens", "cacheInputPerMillionTokens"):
+            price = rng.choice(PRICES)
+            if price is not None:
+                pricing[key] = price
+        models.append(ModelRecord.from_api({
+            "id": f"m{rng.randrange(10_000):04d}-{i}",
+            "providerId": rng.choice(PROVIDERS),
+            "name": f"Model {rng.randrange(8)}",
+            "type": rng.choice(("text", "image")),
+            "capabilities": rng.sample(CAPABILITIES, rng.randrange(len(CAPABILITIES) + 1)),
+            "contextLength": rng.choice((None, 8192, 128000, 200000)),
+            "deprecated": rng.random() < 0.2,
+            "pricing": pricing,
+        }))
+    # Ids are random, so no sort order below is the insertion order.
+    return models
+
+
+def _expected(models: list[ModelRecord], sort_by: str, descending: bool, keep=lambda m: not m.deprecated) -> list[str]:
+    """Reference order: NULLS LAST in both directions, id tie-break in the sort direction."""
+    rows = [m for m in models if keep(m)]
+    present = [m for m in rows if sort_value(m, sort_by) is not None]
+    missing = [m for m in rows if sort_value(m, sort_by) is None]
+    present = sorted(present, key=lambda m: (sort_value(m, sort_by), m.id), reverse=descending)
+    missing = sorted(missing, key=lambda m: m.id, reverse=descending)
+    return [m.id for m in present + missing]
+
+
+def _page_through(catalog: Catalog, limit: int, after=None, **query) -> list[str]:
+    """Ids of every page from `after` on, following each page's keyset."""
+    ids: list[str] = []
+    while True:
+        rows, after = catalog.query(limit=limit, after=after, **query)
+        assert len(rows) <= limit
+        ids.extend(r["id"] for r in rows)
+        if after is None:
+            return ids
+
+
+@pytest.fixture(scope="module")
+def models():
+    return _models()
+
+
+@pytest.fixture(scope="module")
+def catalog(models):
+    return Catalog("v1", [], models)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("sort_by", SORT_KEYS)
+def test_pages_match_sorted(catalog, models, sort_by, descending):
+    expected = _expected(models, sort_by, descending)
+    order = "desc" if descending else "asc"
+    for limit in (1, 7, len(models)):
+        assert _page_through(catalog, limit, sort_by=sort_by, sort_order=order) == expected
+    rows, after = catalog.query(sort_by=sort_by, sort_order=order)
+    assert [r["id"] for r in rows] == expected and after is None
+
+
+def test_nulls_last_both_directions(catalog):
+    for order in ("asc", "desc"):
+        rows, _ = catalog.query(sort_by="input", sort_order=order)
+        prices = [r["pricing"].get("inputPerMillionTokens") for r in rows]
+        first_null = prices.index(None)
+        assert all(p is None for p in prices[first_null:])
+        assert all(p is not None for p in prices[:first_null])
+
+
+@pytest.mark.parametrize("filters", [
+    {"provider_id": "openai"},
+    {"capability": "vision"},
+    {"model_type": "image"},
+    {"provider_id": "google", "capability": "coding", "include_deprecated": True},
+    {"provider_id": "nobody"},
+])
+def test_filter_bitsets(catalog, models, filters):
+    def keep(m):
+        return (
+            (filters.get("include_deprecated") or not m.deprecated)
+            and m.provider_id == filters.get("provider_id", m.provider_id)
+            and m.type == filters.get("model_type", m.type)
+            and ("capability" not in filters or filters["capability"] in m.capabilities)
+        )
+
+    for sort_by, descending in (("blended", True), ("name", False)):
+        expected = _expected(models, sort_by, descending, keep)
+        order = "desc" if descending else "asc"
+        assert _page_through(catalog, 3, sort_by=sort_by, sort_order=order, **filters) == expected
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_cursor_resumes_after_cursor_row_is_gone(models, descending):
+    old = Catalog("v1", [], models)
+    order = "desc" if descending else "asc"
+    first, after = old.query(sort_by="input", sort_order=order, limit=10)
+
+    # The next page is served from a newer snapshot without the cursor row: resume by value.
+    last_id = first[-1]["id"]
+    new = Catalog("v2", [], [m for m in models if m.id != last_id])
+    rest = _page_through(new, 4, after, sort_by="input", sort_order=order)
+    assert [r["id"] for r in first] + rest == _expected(models, "input", descending)
+
+
+def test_cursor_round_trip():
+    values = ["input", True, 0.5, None, "m0001-3"]
+    assert decode_cursor(encode_cursor(values)) == values
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "e30", "bm90IGpzb24"])
+def test_malformed_cursor_rejected(cursor):
+    # "e30" is {} (not a list); "bm90IGpzb24" is "not json".
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("values", [
+    ["output", False, 0.5, "m0001-3"],  # another sort
+    ["input", True, 0.5, "m0001-3"],  # another direction
+    ["input", False, "m0001-3"],  # wrong arity
+])
+def test_cursor_for_another_query_rejected(values):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        asyncio.run(get_models_page(sort_by="input", sort_order="asc", cursor=encode_cursor(values)))
@@ -0,0 +1,76 @@
+"""Scraper HTTP client: conditional GETs against a stub server (httpx.MockTransport)."""
+import asyncio
+
+import httpx
+import pytest
+
+from app.scrapers import fetch as fetch_module
+from app.scrapers.base import BaseScraper
+from app.scrapers.fetch import NotModified, ScraperHttpClient
+
+URL = "https://pricing.example.com/"
+ETAG = '"v1"'
+
+
+class StubServer:
+    """Serves one page with an ETag; answers 304 to a matching If-None-Match."""
+
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304)
+        return httpx.Response(200, text="<table>prices</table>", headers={"ETag": ETAG})
+
+
+class StubScraper(BaseScraper):
+    provider_id = "stub"
+    provider_name = "Stub"
+    pricing_url = URL
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    server = StubServer()
+    client = ScraperHttpClient(cache_dir=tmp_path, transport=httpx.MockTransport(server))
+    monkeypatch.setattr(fetch_module, "_client", client)
+    yield server
+    asyncio.run(client.aclose())
+
+
+def _scrape_run(commit: bool) -> str:
+    """One scrape run: fetch the page, then (on success) commit its validators."""
+    async def run():
+        scraper = StubScraper()
+        text = await scraper.fetch_changed()
+        if commit:
+            scraper.commit_fetches()
+        return text
+
+    return asyncio.run(run())
+
+
+def test_unchanged_page_after_successful_run_is_not_modified(server):
+    assert _scrape_run(commit=True) == "<table>prices</table>"
+    with pytest.raises(NotModified):
+        _scrape_run(commit=True)
+    assert server.requests[1].headers["if-none-match"] == ETAG
+
+
+def test_not_modified_result_carries_cached_body(server):
+    _scrape_run(commit=True)
+    result = asyncio.run(StubScraper().fetch())
+    assert result.not_modified
+    assert result.status_code == 304
+    assert result.text == "<table>prices</table>"
+
+
+def test_failed_run_does_not_cache_validators(server):
+    # Fetched, but parsing / upserting failed: nothing committed.
+    _scrape_run(commit=False)
+    assert _scrape_run(commit=True) == "<table>prices</table>"
+    assert "if-none-match" not in server.requests[1].headers
+    with pytest.raises(NotModified):
+        _scrape_run(commit=True)
@@ -0,0 +1,206 @@
+"""Rate limiter: token buckets on a fake clock, the 429 middleware, X-Forwarded-For and backend sync."""
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app import limiter as limiter_module
+from app.limiter import RateLimiter, RateLimitMiddleware, client_address, parse_rate
+
+
+class FakeClock:
+    """Stands in for the `time` module inside app.limiter."""
+
+    def __init__(self, start: float = 1_000_000.0) -> None:
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeBackend:
+    """Shared counters: adds each push to per-window totals; `peers` are hits from other processes."""
+
+    def __init__(self) -> None:
+        self.totals: dict[tuple[int, str], int] = {}
+        self.pushes: list[dict[str, int]] = []
+        self.fail = False
+
+    def peer_hits(self, window: int, key: str, hits: int) -> None:
+        self.totals[(window, key)] = self.totals.get((window, key), 0) + hits
+
+    async def push(self, window: int, deltas: dict[str, int], ttl: int) -> dict[str, int]:
+        if self.fail:
+            raise ConnectionError("backend down")
+        self.pushes.append(dict(deltas))
+        for key, delta in deltas.items():
+            self.peer_hits(window, key, delta)
+        return {key: self.totals[(window, key)] for key in deltas}
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(limiter_module, "time", clock)
+    return clock
+
+
+@pytest.mark.parametrize("rate, expected", [
+    ("100/minute", (100, 60.0)),
+    ("5/second", (5, 1.0)),
+    ("10 / Hours", (10, 3600.0)),
+    ("1/day", (1, 86400.0)),
+])
+def test_parse_rate(rate, expected):
+    assert parse_rate(rate) == expected
+
+
+@pytest.mark.parametrize("rate", ["", "abc", "10", "10/fortnight", "-1/minute", "1.5/second"])
+def test_parse_rate_rejects(rate):
+    with pytest.raises(ValueError):
+        parse_rate(rate)
+
+
+def test_bucket_refills_evenly(clock):
+    limiter = RateLimiter("3/minute")  # one token every 20s
+    assert [limiter.hit("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.hit("a") == pytest.approx(20.0)
+    assert limiter.hit("b") == 0.0  # buckets are per key
+
+    clock.advance(15)
+    assert limiter.hit("a") == pytest.approx(5.0)
+    clock.advance(5)
+    assert limiter.hit("a") == 0.0
+    assert limiter.hit("a") == pytest.approx(20.0)
+
+    clock.advance(3600)  # refills to the limit, not beyond
+    assert [limiter.hit("a") for _ in range(4)][-1] > 0
+
+
+def test_idle_buckets_are_pruned(clock):
+    limiter = RateLimiter("3/minute")
+    for key in ("a", "b", "c"):
+        limiter.hit(key)
+    clock.advance(61)
+    limiter.hit("d")
+    assert set(limiter._buckets) == {"d"}
+
+
+def _scope(peer: str = "10.0.0.1", forwarded: list[str] | None = None) -> dict:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded or []]
+    return {"type": "http", "headers": headers, "client": (peer, 5000)}
+
+
+@pytest.mark.parametrize("hops, forwarded, expected", [
+    (0, ["1.1.1.1"], "10.0.0.1"),  # untrusted header ignored
+    (1, ["6.6.6.6, 1.1.1.1"], "1.1.1.1"),  # rightmost entry was added by our proxy
+    (2, ["6.6.6.6, 1.1.1.1, 2.2.2.2"], "1.1.1.1"),
+    (2, ["6.6.6.6, 1.1.1.1", "2.2.2.2"], "1.1.1.1"),  # repeated headers join in order
+    (3, ["1.1.1.1, 2.2.2.2"], "10.0.0.1"),  # fewer hops than trusted: spoofable, use the peer
+    (1, [], "10.0.0.1"),
+])
+def test_client_address_trusted_hops(hops, forwarded, expected):
+    assert client_address(_scope(forwarded=forwarded), hops) == expected
+
+
+def test_client_address_without_peer():
+    assert client_address({"type": "http", "headers": [], "client": None}) == "unknown"
+
+
+def _app(limiter: RateLimiter) -> Starlette:
+    async def models(request):
+        return PlainTextResponse("ok")
+
+    @limiter.exempt
+    async def health(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/models", models), Route("/health", health)])
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return app
+
+
+def _get(app: Starlette, path: str, times: int, headers: dict | None = None) -> list[httpx.Response]:
+    async def run():
+        transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 5000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(path, headers=headers) for _ in range(times)]
+
+    return asyncio.run(run())
+
+
+def test_middleware_429_with_retry_after(clock):
+    limiter = RateLimiter("2/minute")
+    responses = _get(_app(limiter), "/models", 3)
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert responses[2].headers["Retry-After"] == "30"
+    assert responses[2].json() == {"error": "Rate limit exceeded: 2 per 1 minute"}
+
+
+def test_middleware_exempt_route_and_forwarded_clients(clock):
+    limiter = RateLimiter("1/minute", trusted_hops=1)
+    app = _app(limiter)
+    assert [r.status_code for r in _get(app, "/health", 3)] == [200, 200, 200]
+    assert [r.status_code for r in _get(app, "/models", 2, {"X-Forwarded-For": "1.1.1.1"})] == [200, 429]
+    # Same socket peer, different client behind the proxy: its own bucket.
+    assert _get(app, "/models", 1, {"X-Forwarded-For": "2.2.2.2"})[0].status_code == 200
+
+
+def test_sync_drains_local_bucket_by_peer_hits(clock):
+    backend = FakeBackend()
+    limiter = RateLimiter("10/minute", backend=backend)
+    window = int(clock.time() // 60)
+    for _ in range(3):
+        assert limiter.hit("a") == 0.0
+
+    backend.peer_hits(window, "a", 5)  # other workers used 5 of the shared 10
+    asyncio.run(limiter.sync())
+    assert backend.pushes == [{"a": 3}]
+    assert [limiter.hit("a") for _ in range(2)] == [0.0, 0.0]  # 10 - 3 own - 5 peers
+    assert limiter.hit("a") > 0
+
+    # Peers already counted are not drained twice.
+    clock.advance(6)  # one token refills
+    asyncio.run(limiter.sync())
+    assert backend.pushes[-1] == {"a": 2}
+    assert limiter.hit("a") == 0.0
+
+
+def test_sync_keeps_counts_when_backend_fails(clock):
+    backend = FakeBackend()
+    limiter = RateLimiter("10/minute", backend=backend)
+    limiter.hit("a")
+    limiter.hit("a")
+
+    backend.fail = True
+    with pytest.raises(ConnectionError):
+        asyncio.run(limiter.sync())
+    backend.fail = False
+    limiter.hit("a")
+    asyncio.run(limiter.sync())
+    assert backend.pushes == [{"a": 3}]
+
+
+def test_sync_resets_peer_counts_each_window(clock):
+    backend = FakeBackend()
+    limiter = RateLimiter("10/minute", backend=backend)
+    limiter.hit("a")
+    backend.peer_hits(int(clock.time() // 60), "a", 9)
+    asyncio.run(limiter.sync())
+    assert limiter.hit("a") > 0
+
+    clock.advance(60)  # new window: bucket refilled, old peer hits no longer count
+    asyncio.run(limiter.sync())
+    assert [limiter.hit("a") for _ in range(10)] == [0.0] * 10
@@ -0,0 +1,52 @@
+"""Request metrics: label cardinality stays bounded whatever the client sends."""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import metrics
+from app.metrics import Histogram, MetricsMiddleware
+
+
+@pytest.fixture
+def histogram(monkeypatch):
+    histogram = Histogram("http_request_duration_seconds", "test", ("method", "route", "status"))
+    monkeypatch.setattr(metrics, "http_request_duration", histogram)
+    return histogram
+
+
+def _request(method: str, path: str) -> None:
+    app = FastAPI()
+
+    @app.api_route("/items/{id}", methods=["GET", "PURGE"])
+    async def item(id: str):
+        return "ok"
+
+    app.add_middleware(MetricsMiddleware)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.request(method, path)
+
+    asyncio.run(run())
+
+
+def test_route_template_and_known_methods(histogram):
+    _request("GET", "/items/1")
+    _request("GET", "/items/2")
+    _request("POST", "/items/3")
+    assert set(histogram.values) == {("GET", "/items/{id}", "200"), ("POST", "/items/{id}", "405")}
+
+
+def test_unknown_methods_and_paths_share_series(histogram):
+    for method in ("PURGE", "XYZZY1", "XYZZY2"):
+        _request(method, "/items/1")
+    _request("GET", "/random/1")
+    _request("GET", "/random/2")
+    assert set(histogram.values) == {
+        ("other", "/items/{id}", "200"),
+        ("other", "/items/{id}", "405"),
+        ("GET", "unmatched", "404"),
+    }
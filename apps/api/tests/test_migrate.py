@@ -0,0 +1,68 @@
+"""Migration runner: statement splitting and the no-transaction marker (jobs/scrape/run_migrate.py)."""
+import pytest
+
+from jobs.scrape.run_migrate import MIGRATIONS_DIR, Migration, load_migrations, split_statements
+
+
+def test_splits_on_top_level_semicolons():
+    assert split_statements("SELECT 1;\nSELECT 2;\n\nSELECT 3") == ["SELECT 1", "SELECT 2", "SELECT 3"]
+
+
+@pytest.mark.parametrize("statement", [
+    "SELECT 'a;b'",
+    "SELECT 'it''s; fine'",
+    'SELECT 1 AS "odd;name"',
+    'SELECT 1 AS "say ""hi;"""',
+])
+def test_quoted_semicolons(statement):
+    assert split_statements(f"{statement};\nSELECT 2;") == [statement, "SELECT 2"]
+
+
+def test_comments():
+    sql = (
+        "-- leading comment; not a statement\n"
+        "SELECT 1; -- trailing; comment\n"
+        "/* block;\n comment */ SELECT 2;\n"
+        "-- only a comment after the last statement;\n"
+    )
+    # Comments stay with the statement they precede; a comment-only tail is dropped.
+    assert split_statements(sql) == [
+        "-- leading comment; not a statement\nSELECT 1",
+        "-- trailing; comment\n/* block;\n comment */ SELECT 2",
+    ]
+
+
+def test_dollar_quoted_bodies():
+    function = (
+        "CREATE FUNCTION f() RETURNS int AS $$\n"
+        "BEGIN\n  PERFORM 1; RETURN 2;\nEND\n$$ LANGUAGE plpgsql"
+    )
+    tagged = "DO $body$\nBEGIN\n  EXECUTE 'SELECT $$;$$';\nEND\n$body$"
+    assert split_statements(f"{function};\n{tagged};\nSELECT 3;") == [function, tagged, "SELECT 3"]
+
+
+def test_positional_parameters_are_not_dollar_quotes():
+    sql = "PREPARE p AS SELECT $1, $2;\nSELECT 3;"
+    assert split_statements(sql) == ["PREPARE p AS SELECT $1, $2", "SELECT 3"]
+
+
+@pytest.mark.parametrize("sql, transactional", [
+    ("-- migrate:no-transaction\nCREATE INDEX CONCURRENTLY i ON t (a);", False),
+    ("\n  -- Migrate:No-Transaction  \nSELECT 1;", False),
+    ("-- Creates an index.\n-- migrate:no-transaction\nSELECT 1;", False),
+    ("CREATE TABLE t (a int);\n-- migrate:no-transaction", True),  # after SQL: not a header
+    ("-- mentions -- migrate:no-transaction inline\nSELECT 1;", True),
+    ("SELECT 1;", True),
+])
+def test_no_transaction_marker(sql, transactional):
+    assert Migration("x.sql", sql).transactional is transactional
+
+
+def test_concurrent_index_migration_splits_into_runnable_statements():
+    migration = next(m for m in load_migrations(MIGRATIONS_DIR) if m.name.startswith("009_"))
+    assert not migration.transactional
+    statements = split_statements(migration.sql)
+    assert len(statements) == 3
+    assert statements[0].splitlines()[-1] == "$$"
+    assert statements[1].startswith("CREATE INDEX CONCURRENTLY")
+    assert statements[2].startswith("DROP INDEX CONCURRENTLY")
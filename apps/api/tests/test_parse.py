@@ -0,0 +1,148 @@
+"""Scraper parse stage: a fixture scraper parsed inline and in the process pool."""
+import asyncio
+import os
+import pickle
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.scrapers import fetch as fetch_module
+from app.scrapers.base import BaseScraper
+from app.scrapers.fetch import ScraperHttpClient
+from app.scrapers.parse import close_parse_executor, enable_parse_pool, run_parse, soup
+
+URL = "https://pricing.example.com/"
+ETAG = '"v1"'
+FIXTURE = (Path(__file__).parent / "fixtures" / "pricing.html").read_text()
+
+EXPECTED = [
+    ("fixture-fixture-chat", 0.28, 0.42, 128000),
+    ("fixture-fixture-reasoner", 0.55, 2.19, 64000),
+]
+
+
+def _price(cell: str) -> float:
+    return float(cell.strip().lstrip("$"))
+
+
+def _tokens(cell: str) -> int:
+    cell = cell.strip().upper()
+    return int(cell[:-1]) * 1000 if cell.endswith("K") else int(cell)
+
+
+class FixtureScraper(BaseScraper):
+    """Minimal live-page scraper: one pricing table (tests/fixtures/pricing.html)."""
+
+    provider_id = "fixture"
+    provider_name = "Fixture"
+    pricing_url = URL
+
+    def parse(self, source: str) -> list[dict]:
+        models = []
+        for row in soup(source).select("#pricing tbody tr"):
+            name, api_id, input_price, output_price, context = (td.get_text() for td in row.find_all("td"))
+            models.append({
+                "id": f"{self.provider_id}-{api_id}",
+                "providerId": self.provider_id,
+                "name": name,
+                "apiId": api_id,
+                "type": "text",
+                "modalities": ["text"],
+                "contextLength": _tokens(context),
+                "pricing": {
+                    "inputPerMillionTokens": _price(input_price),
+                    "outputPerMillionTokens": _price(output_price),
+                },
+                "sourceUrl": self.pricing_url,
+            })
+        return models
+
+
+class BrokenScraper(FixtureScraper):
+    def parse(self, source: str) -> list[dict]:
+        raise ValueError("pricing table layout changed")
+
+
+@pytest.fixture
+def page_requests(tmp_path, monkeypatch):
+    """Serve the fixture page with an ETag; 304 to a matching If-None-Match."""
+    seen: list[httpx.Request] = []
+
+    def serve(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304)
+        return httpx.Response(200, text=FIXTURE, headers={"ETag": ETAG})
+
+    client = ScraperHttpClient(cache_dir=tmp_path, transport=httpx.MockTransport(serve))
+    monkeypatch.setattr(fetch_module, "_client", client)
+    yield seen
+    asyncio.run(client.aclose())
+
+
+@pytest.fixture
+def parse_pool(monkeypatch):
+    monkeypatch.setenv("SCRAPE_PARSE_WORKERS", "1")
+    enable_parse_pool()
+    yield
+    close_parse_executor()
+
+
+def _summary(models: list[dict]) -> list[tuple]:
+    return [
+        (m["id"], m["pricing"]["inputPerMillionTokens"], m["pricing"]["outputPerMillionTokens"], m["contextLength"])
+        for m in models
+    ]
+
+
+def test_parse_fixture_inline():
+    assert _summary(FixtureScraper().parse(FIXTURE)) == EXPECTED
+
+
+def test_parse_fixture_in_process_pool(parse_pool):
+    async def run():
+        # The pool is really used: the call lands in another process.
+        assert await run_parse(os.getpid) != os.getpid()
+        return await run_parse(FixtureScraper().parse, FIXTURE)
+
+    assert asyncio.run(run()) == FixtureScraper().parse(FIXTURE)
+
+
+def test_scrape_fetches_then_parses_in_pool(page_requests, parse_pool):
+    provider, models = asyncio.run(FixtureScraper().scrape())
+    assert provider["id"] == "fixture"
+    assert _summary(models) == EXPECTED
+
+
+def test_failed_parse_does_not_cache_validators(page_requests, parse_pool):
+    with pytest.raises(ValueError):
+        asyncio.run(BrokenScraper().scrape())
+
+    # The job only commits validators after the upsert, so the page is parsed again next run.
+    _, models = asyncio.run(FixtureScraper().scrape())
+    assert _summary(models) == EXPECTED
+    assert "if-none-match" not in page_requests[1].headers
+
+
+def test_parse_pickles_without_fetched_pages(page_requests):
+    scraper = FixtureScraper()
+    source = asyncio.run(scraper.fetch_source())
+    assert scraper.fetched and scraper.fetched[0].text == source
+
+    # What run_parse ships to the worker: the bound method, minus this run's page bodies.
+    shipped = pickle.loads(pickle.dumps(scraper.parse))
+    assert shipped.__self__.fetched == []
+    assert len(pickle.dumps(scraper.parse)) < len(source)
+    assert scraper.fetched  # still committed by the job after the upsert
+
+
+def test_scrape_requires_parse_before_fetching(page_requests):
+    class NoParseScraper(BaseScraper):
+        provider_id = "noparse"
+        provider_name = "No parse"
+        pricing_url = URL
+
+    with pytest.raises(TypeError, match="must implement parse"):
+        asyncio.run(NoParseScraper().scrape())
+    assert page_requests == []
@@ -0,0 +1,39 @@
+"""Catalog records: in-memory sort prices agree with the generated *_price columns."""
+import pytest
+
+from app.services.records import ModelRecord
+
+
+def _input_price(value):
+    return ModelRecord.from_api({
+        "id": "m", "providerId": "p", "name": "M", "type": "text",
+        "pricing": {"inputPerMillionTokens": value},
+    }).input_price
+
+
+@pytest.mark.parametrize("value, expected", [
+    (3, 3.0),
+    (0.15, 0.15),
+    ("2.5", 2.5),
+    ("-1", -1.0),
+    ("1e-3", 0.001),
+    ("10.", 10.0),
+    (None, None),
+    ("", None),
+    ("free", None),
+    (True, None),
+    (False, None),
+    ("nan", None),
+    ("inf", None),
+    ("-Infinity", None),
+    (float("nan"), None),
+    (float("inf"), None),
+    (" 1", None),
+    (".5", None),
+    ("+1", None),
+    ("1_000", None),
+    ([1], None),
+])
+def test_price_matches_generated_column(value, expected):
+    # Expected values are what migration 006's regex-guarded ::numeric cast yields.
+    assert _input_price(value) == expected
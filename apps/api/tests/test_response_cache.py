@@ -0,0 +1,64 @@
+"""Compressed variants of cached response bodies."""
+import asyncio
+import gzip
+
+import pytest
+
+from app.services import response_cache
+from app.services.response_cache import THREAD_COMPRESS_BYTES, CachedBody
+
+
+def _large_body() -> CachedBody:
+    # Over THREAD_COMPRESS_BYTES, so variants are built in a worker thread.
+    return CachedBody.build([{"id": f"model-{i}", "price": i / 7} for i in range(THREAD_COMPRESS_BYTES // 10)], "models")
+
+
+def test_concurrent_requests_share_one_compression():
+    entry = _large_body()
+
+    async def both():
+        return await asyncio.gather(entry.variant("gzip"), entry.variant("gzip"))
+
+    first, second = asyncio.run(both())
+    assert first == second
+    body, etag = first
+    assert gzip.decompress(body) == entry.body
+    assert etag == f'{entry.etag[:-1]}-gzip"'
+    # Settled: later requests get the stored variant, not the build future.
+    assert asyncio.run(entry.variant("gzip")) == first
+
+
+def test_failed_compression_is_retried(monkeypatch):
+    entry = _large_body()
+    calls = []
+
+    def flaky(body: bytes) -> bytes:
+        calls.append(len(body))
+        if len(calls) == 1:
+            raise MemoryError("compressor failed")
+        return gzip.compress(body)
+
+    monkeypatch.setitem(response_cache.COMPRESSORS, "gzip", flaky)
+
+    async def both():
+        return await asyncio.gather(entry.variant("gzip"), entry.variant("gzip"), return_exceptions=True)
+
+    results = asyncio.run(both())
+    assert all(isinstance(r, MemoryError) for r in results)
+    body, _ = asyncio.run(entry.variant("gzip"))
+    assert gzip.decompress(body) == entry.body
+    assert len(calls) == 2
+
+
+def test_small_bodies_are_not_compressed():
+    entry = CachedBody.build({"id": "tiny"})
+    assert asyncio.run(entry.variant("gzip")) is None
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip;q=0, identity", None),
+    ("*", next(iter(response_cache.COMPRESSORS))),
+])
+def test_preferred_encoding(header, expected):
+    assert response_cache.preferred_encoding(header) == expected
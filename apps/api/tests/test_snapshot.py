@@ -0,0 +1,111 @@
+"""Catalog snapshot files: write, mmap read, header-only version and format checks."""
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services import snapshot
+from app.services.catalog import Catalog
+from app.services.records import ModelRecord, ProviderRecord
+from app.services.snapshot import read_snapshot, snapshot_version, write_snapshot
+
+UPDATED = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+# Shaped like CATALOG_VERSION_QUERY rows: counts, timestamptz and digests.
+VERSION = (2, UPDATED, "p-digest", 3, UPDATED, "m-digest")
+
+
+def _catalog(input_price: float = 3, version: tuple = VERSION) -> Catalog:
+    providers = [
+        ProviderRecord.from_api({"id": "anthropic", "name": "Anthropic", "pricingUrl": "https://a.example/pricing"}),
+        ProviderRecord.from_api({"id": "openai", "name": "OpenAI", "pricingUrl": "https://o.example/pricing",
+                                 "apiDocsUrl": "https://o.example/docs", "lastUpdated": UPDATED.isoformat()}),
+    ]
+    models = [
+        ModelRecord.from_api({
+            "id": "anthropic-sonnet", "providerId": "anthropic", "name": "Sonnet", "type": "text",
+            "modalities": ["text", "image"], "capabilities": ["coding"], "contextLength": 200000,
+            "pricing": {"inputPerMillionTokens": input_price, "outputPerMillionTokens": 15},
+            "lastUpdated": UPDATED.isoformat(),
+        }),
+        ModelRecord.from_api({
+            "id": "openai-legacy", "providerId": "openai", "name": "Legacy", "type": "text",
+            "deprecated": True, "deprecationDate": "2025-06-01", "pricing": {},
+            "selfHosted": {"license": "none"},
+        }),
+        ModelRecord.from_api({
+            "id": "openai-mini", "providerId": "openai", "name": "Mini", "type": "text",
+            "pricing": {"inputPerMillionTokens": "0.15", "outputPerMillionTokens": 0.6},
+        }),
+    ]
+    return Catalog(version, providers, models)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    original = _catalog()
+    size = write_snapshot(original, path)
+    assert size == (tmp_path / "catalog.snap").stat().st_size
+
+    loaded = read_snapshot(path)
+    assert loaded.version == VERSION
+    assert [p.to_api() for p in loaded.providers] == [p.to_api() for p in original.providers]
+    assert [m.to_api() for m in loaded.models] == [m.to_api() for m in original.models]
+    # Sort orders come from the file, not a rebuild.
+    assert loaded.index.orders == original.index.orders
+    assert loaded.query(sort_by="input")[0] == original.query(sort_by="input")[0]
+
+
+def test_version_from_header_matches_content_version(tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    assert snapshot_version(path) is None
+    write_snapshot(_catalog(), path)
+    content_hash = snapshot_version(path)
+    assert isinstance(content_hash, str) and len(content_hash) == 32
+    assert read_snapshot(path, content_version=True).version == content_hash
+
+
+def test_unchanged_content_is_not_rewritten(tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    write_snapshot(_catalog(), path)
+    first = snapshot_version(path)
+
+    # Same data under another database version (e.g. a probe-only change): same file.
+    assert write_snapshot(_catalog(version=VERSION[:2] + ("other",) + VERSION[3:]), path) is None
+    assert snapshot_version(path) == first
+
+    assert write_snapshot(_catalog(input_price=2.5), path) is not None
+    assert snapshot_version(path) != first
+    assert read_snapshot(path).models[0].input_price == 2.5
+    assert [p.name for p in tmp_path.iterdir()] == ["catalog.snap"]  # no temp files left
+
+
+def test_rejects_bad_magic(tmp_path):
+    path = tmp_path / "catalog.snap"
+    write_snapshot(_catalog(), str(path))
+    data = bytearray(path.read_bytes())
+    data[0:1] = b"X"
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="Not a catalog snapshot"):
+        read_snapshot(str(path))
+    with pytest.raises(ValueError, match="Not a catalog snapshot"):
+        snapshot_version(str(path))
+    # A writer replaces an unreadable file instead of failing.
+    assert write_snapshot(_catalog(), str(path)) is not None
+    assert read_snapshot(str(path)).version == VERSION
+
+
+def test_rejects_other_format(tmp_path, monkeypatch):
+    path = str(tmp_path / "catalog.snap")
+    monkeypatch.setattr(snapshot, "SNAPSHOT_FORMAT", snapshot.SNAPSHOT_FORMAT + 1)
+    write_snapshot(_catalog(), path)
+    monkeypatch.undo()
+    with pytest.raises(ValueError, match="Unsupported catalog snapshot format"):
+        read_snapshot(path)
+    with pytest.raises(ValueError, match="Unsupported catalog snapshot format"):
+        snapshot_version(path)
+
+
+def test_rejects_truncated_file(tmp_path):
+    path = tmp_path / "catalog.snap"
+    path.write_bytes(snapshot.MAGIC)
+    with pytest.raises(ValueError, match="Truncated"):
+        snapshot_version(str(path))
@@ -0,0 +1 @@
+# Benchmark jobs
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Benchmark the API read paths and the scrape pipeline.
+Usage: python -m jobs.bench.run_bench > bench.json
+
+Synthetic catalogs (default 100, 10k and 100k models) are generated from the
+output of the six scrapers: every scraped model is a template, cloned with a
+new id and jittered prices / limits, so field shapes and value mixes match
+production. The app is driven in-process through httpx.ASGITransport.
+
+Backends (BENCH_BACKEND):
+  memory    catalog snapshot installed directly, no database (default)
+  postgres  catalog written through the real upsert pipeline into
+            BENCH_DATABASE_URL, then served both from the snapshot and from
+            SQL (CATALOG_CACHE=false). That database is TRUNCATED — use a
+            scratch database with migrations applied.
+
+With the postgres backend, `run_scrape` is also timed end to end twice
+(empty tables, then an unchanged re-run). Set BENCH_SCRAPE=0 to skip.
+
+Config: BENCH_SIZES (comma-separated), BENCH_REQUESTS (per scenario, default
+200), BENCH_CONCURRENCY (default 8), BENCH_OUTPUT (file; default stdout).
+Output is JSON: throughput and p50/p95/p99 latency per scenario.
+
+Sort/filter scenarios follow X-Next-Cursor through up to MAX_SCENARIO_PAGES
+pages with the response cache off, so they time the CatalogIndex / SQL keyset
+path; "models cached page" times response-cache hits.
+"""
+import asyncio
+import copy
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(root))
+sys.path.insert(0, str(root / "apps" / "api"))
+
+from dotenv import load_dotenv
+
+load_dotenv(root / ".env")
+
+BENCH_BACKEND = os.getenv("BENCH_BACKEND", "memory")
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "")
+BENCH_SIZES = [int(s) for s in os.getenv("BENCH_SIZES", "100,10000,100000").split(",") if s.strip()]
+BENCH_REQUESTS = int(os.getenv("BENCH_REQUESTS", "200"))
+BENCH_CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "8"))
+BENCH_OUTPUT = os.getenv("BENCH_OUTPUT", "")
+BENCH_SCRAPE = os.getenv("BENCH_SCRAPE", "1").strip().lower() in ("1", "true", "yes", "on")
+
+# Full unpaginated lists are large at 100k models; cap their request count.
+FULL_LIST_REQUESTS = 20
+# Pages walked per sort/filter scenario (following X-Next-Cursor); its requests cycle through them.
+MAX_SCENARIO_PAGES = 50
+
+if BENCH_BACKEND == "postgres":
+    if not BENCH_DATABASE_URL:
+        print("ERROR: BENCH_BACKEND=postgres needs BENCH_DATABASE_URL (a scratch database; it is truncated)")
+        sys.exit(1)
+    os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+# Measure the app, not the limiter; no background watcher (lifespan is not run).
+os.environ["RATE_LIMIT"] = ""
+os.environ["CATALOG_LISTEN"] = "false"
+os.environ["CATALOG_REFRESH_SECONDS"] = "1000000000"
+
+# Import after env setup
+import httpx
+
+from app.config import get_catalog_cache_enabled
+from app.db import acquire, close_pool
+from app.main import app
+from app.scrapers.registry import SCRAPERS
+from app.services.catalog import Catalog, catalog_store
+from app.services.catalog_index import SORT_KEYS
+from app.services.records import ModelRecord, ProviderRecord
+from app.services.response_cache import MAX_ENTRIES, response_cache
+from app.services.upsert_service import publish_catalog, upsert_provider_models
+
+
+async def scraped_templates() -> tuple[list[dict], list[dict]]:
+    """Providers and models from every scraper (static data, no network)."""
+    providers, models = [], []
+    for Scraper in SCRAPERS:
+        provider, provider_models = await Scraper().scrape()
+        providers.append(provider)
+        models.extend(provider_models)
+    return providers, models
+
+
+def synthetic_models(templates: list[dict], size: int, seed: int = 42) -> list[dict]:
+    """`size` models cloned from scraped templates, with unique ids and jittered numbers."""
+    rng = random.Random(seed)
+    models = []
+    for i in range(size):
+        template = templates[i % len(templates)]
+        generation = i // len(templates)
+        m = copy.deepcopy(template)
+        if generation:
+            m["id"] = f"{template['id']}-g{generation}"
+            m["name"] = f"{template['name']} g{generation}"
+            if m.get("apiId"):
+                m["apiId"] = f"{template['apiId']}-g{generation}"
+            m["pricing"] = {
+                k: round(v * rng.uniform(0.5, 1.5), 4) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+                for k, v in m["pricing"].items()
+            }
+            if m.get("contextLength"):
+                m["contextLength"] = int(m["contextLength"] * rng.choice((0.25, 0.5, 1, 2)))
+            m["deprecated"] = rng.random() < 0.1
+        models.append(m)
+    return models
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(q / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def load_test(
+    client: httpx.AsyncClient, urls: list[str], concurrency: int, headers: dict[str, str] | None = None
+) -> dict:
+    """Issue `urls` with `concurrency` workers; throughput and latency percentiles."""
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < len(urls):
+            url = urls[next_index]
+            next_index += 1
+            started = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(urls),
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(len(urls) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 3),
+            "p95": round(_percentile(latencies, 95) * 1000, 3),
+            "p99": round(_percentile(latencies, 99) * 1000, 3),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+    }
+
+
+def scenarios(models: list[dict], requests: int, seed: int = 7) -> list[tuple[str, list[str], bool]]:
+    """(name, urls, paged): every /api/models filter x sort combination, plus compare and by-id lookups.
+
+    Paged scenarios list only their first page; run_scenarios() walks the rest
+    and runs them with the response cache off, so they time the query path
+    (CatalogIndex or SQL keyset) rather than cached bodies. "models cached page"
+    times the cache-hit path on its own.
+    """
+    rng = random.Random(seed)
+    provider = models[0]["providerId"]
+    filters = {"none": "", "provider": f"&provider={provider}", "capability": "&capability=coding", "type": "&type=text"}
+    out = []
+    for sort_by in SORT_KEYS:
+        for order in ("asc", "desc"):
+            for filter_name, query in filters.items():
+                url = f"/api/models?sort_by={sort_by}&sort_order={order}&limit=100{query}"
+                out.append((f"models sort={sort_by}:{order} filter={filter_name}", [url] * requests, True))
+    out.append(("models cached page", ["/api/models?sort_by=input&limit=100"] * requests, False))
+    out.append(("models full list", ["/api/models"] * min(requests, FULL_LIST_REQUESTS), False))
+    ids = [m["id"] for m in models]
+    out.append(("model by id", [f"/api/models/{rng.choice(ids)}" for _ in range(requests)], False))
+    out.append((
+        "compare 4 ids",
+        [f"/api/compare?ids={','.join(rng.sample(ids, min(4, len(ids))))}" for _ in range(requests)],
+        False,
+    ))
+    return out
+
+
+async def page_urls(
+    client: httpx.AsyncClient, url: str, count: int, headers: dict[str, str] | None = None
+) -> list[str]:
+    """`count` requests cycling through the pages of `url` (up to MAX_SCENARIO_PAGES), following X-Next-Cursor."""
+    pages = [url]
+    while len(pages) < min(count, MAX_SCENARIO_PAGES):
+        cursor = (await client.get(pages[-1], headers=headers)).headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        pages.append(f"{url}&cursor={cursor}")
+    return [pages[i % len(pages)] for i in range(count)]
+
+
+async def run_scenarios(client: httpx.AsyncClient, models: list[dict], size: int, path: str) -> list[dict]:
+    results = []
+    for name, urls, paged in scenarios(models, BENCH_REQUESTS):
+        headers = None
+        if paged:
+            # Response cache off: every request (including the page walk) builds its page. Uncompressed,
+            # like uncached responses are served, so the timing is the query and JSON encoding.
+            response_cache.max_entries = 0
+            response_cache.clear()
+            headers = {"Accept-Encoding": "identity"}
+        try:
+            if paged:
+                urls = await page_urls(client, urls[0], len(urls), headers)
+            result = await load_test(client, urls, BENCH_CONCURRENCY, headers)
+        finally:
+            response_cache.max_entries = MAX_ENTRIES
+        results.append({"size": size, "path": path, "scenario": name, "pages": len(set(urls)), **result})
+        print(f"  [{size} {path}] {name}: p50 {result['latency_ms']['p50']}ms "
+              f"p99 {result['latency_ms']['p99']}ms {result['throughput_rps']} req/s", file=sys.stderr)
+    return results
+
+
+async def truncate_tables() -> None:
+    async with acquire() as conn:
+        await conn.execute("TRUNCATE providers, models, price_history")
+
+
+async def seed_database(providers: list[dict], models: list[dict]) -> dict:
+    """Replace the bench database contents through the real upsert pipeline; timings."""
+    await truncate_tables()
+    by_provider: dict[str, list[dict]] = {}
+    for m in models:
+        by_provider.setdefault(m["providerId"], []).append(m)
+    started = time.perf_counter()
+    for provider in providers:
+        await upsert_provider_models(provider, by_provider.get(provider["id"], []))
+    upsert_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    async with acquire() as conn:
+        await publish_catalog(conn)
+    return {
+        "upsert_seconds": round(upsert_seconds, 3),
+        "upsert_rows_per_second": round(len(models) / upsert_seconds, 1) if upsert_seconds else None,
+        "catalog_view_refresh_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def time_scrape() -> list[dict]:
+    """Run `python -m jobs.scrape.run_scrape` end to end: into empty tables, then unchanged."""
+    env = {**os.environ, "DATABASE_URL": BENCH_DATABASE_URL, "SCRAPE_CACHE_DIR": ""}
+    runs = []
+    for label in ("cold (empty tables)", "warm (unchanged re-run)"):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-m", "jobs.scrape.run_scrape"],
+            cwd=root, env=env, capture_output=True, text=True,
+        )
+        runs.append({
+            "run": label,
+            "seconds": round(time.perf_counter() - started, 3),
+            "exit_code": proc.returncode,
+            "summary": (proc.stdout.strip().splitlines() or [""])[-1],
+        })
+    return runs
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def bench() -> dict:
+    providers, templates = await scraped_templates()
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": BENCH_BACKEND,
+            "sizes": BENCH_SIZES,
+            "requests_per_scenario": BENCH_REQUESTS,
+            "concurrency": BENCH_CONCURRENCY,
+            "template_models": len(templates),
+        },
+        "results": [],
+        "seed": [],
+        "scrape": None,
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for size in BENCH_SIZES:
+            models = synthetic_models(templates, size)
+            if BENCH_BACKEND == "postgres":
+                seed = await seed_database(providers, models)
+                report["seed"].append({"size": size, **seed})
+                for cache in ("true", "false"):
+                    os.environ["CATALOG_CACHE"] = cache
+                    get_catalog_cache_enabled.cache_clear()
+                    catalog_store.invalidate()
+                    path = "snapshot" if cache == "true" else "sql"
+                    report["results"].extend(await run_scenarios(client, models, size, path))
+            else:
+                catalog_store.set(Catalog(
+                    ("bench", size),
+                    [ProviderRecord.from_api(p) for p in providers],
+                    [ModelRecord.from_api(m) for m in models],
+                ))
+                report["results"].extend(await run_scenarios(client, models, size, "snapshot"))
+    if BENCH_BACKEND == "postgres":
+        if BENCH_SCRAPE:
+            await truncate_tables()
+        await close_pool()
+        if BENCH_SCRAPE:
+            report["scrape"] = time_scrape()
+    return report
+
+
+def main() -> None:
+    report = asyncio.run(bench())
+    output = json.dumps(report, indent=2)
+    if BENCH_OUTPUT:
+        Path(BENCH_OUTPUT).write_text(output + "\n")
+        print(f"Wrote {BENCH_OUTPUT}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Measure API cold start against budgets.
+Usage: DATABASE_URL=... python -m jobs.bench.run_startup
+
+- import: `import app.main` in a fresh interpreter (median of BENCH_IMPORT_RUNS)
+- ready: uvicorn spawn until GET /health returns 200 (warm-up finished)
+- first fast response: spawn until GET /api/models completes in under
+  BENCH_FAST_RESPONSE_MS
+
+Prints a JSON report and exits 1 when a budget is exceeded, so CI can keep
+cold starts from regressing. Budgets (ms): BENCH_IMPORT_BUDGET_MS (default
+1500), BENCH_READY_BUDGET_MS and BENCH_FIRST_FAST_BUDGET_MS (default 5000).
+"""
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+root = Path(__file__).resolve().parents[2]
+api_dir = root / "apps" / "api"
+
+BENCH_IMPORT_RUNS = int(os.getenv("BENCH_IMPORT_RUNS", "5"))
+BENCH_FAST_RESPONSE_MS = float(os.getenv("BENCH_FAST_RESPONSE_MS", "50"))
+BENCH_IMPORT_BUDGET_MS = float(os.getenv("BENCH_IMPORT_BUDGET_MS", "1500"))
+BENCH_READY_BUDGET_MS = float(os.getenv("BENCH_READY_BUDGET_MS", "5000"))
+BENCH_FIRST_FAST_BUDGET_MS = float(os.getenv("BENCH_FIRST_FAST_BUDGET_MS", "5000"))
+
+# Give up on a server that never becomes ready / fast.
+STARTUP_TIMEOUT_SECONDS = 60.0
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def _env() -> dict:
+    # Measure the app, not the limiter.
+    return {**os.environ, "PYTHONPATH": str(api_dir), "RATE_LIMIT": ""}
+
+
+def measure_import() -> dict:
+    runs = []
+    for _ in range(max(1, BENCH_IMPORT_RUNS)):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET], cwd=api_dir, env=_env(), capture_output=True, text=True, check=True
+        )
+        runs.append(float(out.stdout.strip().splitlines()[-1]) * 1000)
+    return {"median_ms": round(statistics.median(runs), 1), "runs_ms": [round(r, 1) for r in runs]}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_server() -> dict:
+    """Spawn uvicorn and time readiness and the first fast /api/models response."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=api_dir,
+        env=_env(),
+    )
+    result: dict = {"listening_ms": None, "ready_ms": None, "first_response_ms": None, "first_fast_ms": None}
+    try:
+        with httpx.Client(base_url=base, timeout=10.0) as client:
+            deadline = started + STARTUP_TIMEOUT_SECONDS
+            while time.perf_counter() < deadline and result["ready_ms"] is None:
+                try:
+                    status = client.get("/health").status_code
+                except httpx.TransportError:
+                    time.sleep(0.01)
+                    continue
+                if result["listening_ms"] is None:
+                    result["listening_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                if status == 200:
+                    result["ready_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                else:
+                    time.sleep(0.01)
+            latencies = []
+            while time.perf_counter() < deadline and result["ready_ms"] is not None:
+                t = time.perf_counter()
+                response = client.get("/api/models", headers={"Accept-Encoding": "gzip, br"})
+                latency = (time.perf_counter() - t) * 1000
+                latencies.append(round(latency, 2))
+                if result["first_response_ms"] is None:
+                    result["first_response_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                if response.status_code == 200 and latency < BENCH_FAST_RESPONSE_MS:
+                    result["first_fast_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                    break
+            result["models_latencies_ms"] = latencies
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return result
+
+
+def main() -> None:
+    imports = measure_import()
+    server = measure_server()
+    budgets = {
+        "import_ms": (imports["median_ms"], BENCH_IMPORT_BUDGET_MS),
+        "ready_ms": (server["ready_ms"], BENCH_READY_BUDGET_MS),
+        "first_fast_ms": (server["first_fast_ms"], BENCH_FIRST_FAST_BUDGET_MS),
+    }
+    over = [name for name, (value, budget) in budgets.items() if value is None or value > budget]
+    report = {
+        "import": imports,
+        "server": server,
+        "budgets_ms": {name: budget for name, (_, budget) in budgets.items()},
+        "over_budget": over,
+    }
+    print(json.dumps(report, indent=2))
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ import asyncio
 import json
 import os
 import sys
+import time
 from pathlib import Path
 
 # Add project root and apps/api to path
@@ -20,31 +21,109 @@ load_dotenv(root / ".env")
 
 # Import after path setup
 from app.db import get_pool, close_pool
+from app.scrapers.fetch import NotModified, close_http_client
+from app.scrapers.parse import close_parse_executor, enable_parse_pool
 from app.scrapers.registry import SCRAPERS
-from app.services.upsert_service import upsert_provider, upsert_model
+from app.services.db_service import load_catalog
+from app.services.upsert_service import refresh_catalog_view, upsert_provider_models
+
+# Max scrapers running at once, and per-scraper time budget (seconds).
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "6"))
+SCRAPE_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_TIMEOUT_SECONDS", "120"))
+# Catalog snapshot file written after each run (empty = none); see app.services.snapshot.
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH", "").strip()
+
+
+async def _scrape(ScraperClass, semaphore: asyncio.Semaphore, timeout: float):
+    """Run one scraper under the concurrency cap and timeout.
+
+    Returns (scraper, (provider, models) or None, error or None, seconds);
+    result and error are both None when the source page was unchanged (304).
+    """
+    scraper = ScraperClass()
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(scraper.scrape(), timeout)
+        except NotModified:
+            return scraper, None, None, time.perf_counter() - started
+        except asyncio.TimeoutError:
+            return scraper, None, f"timed out after {timeout:g}s", time.perf_counter() - started
+        except Exception as e:
+            return scraper, None, str(e), time.perf_counter() - started
+    return scraper, result, None, time.perf_counter() - started
+
+
+async def write_catalog_snapshot(path: str) -> None:
+    """Write the published catalog (as the API reads it) to `path`, unless the file already holds it."""
+    from app.services.snapshot import write_snapshot
+
+    catalog = await load_catalog()
+    size = write_snapshot(catalog, path)
+    if size is None:
+        print(f"  snapshot {path} already current")
+        return
+    print(f"  snapshot written to {path}: {len(catalog.models)} models, {size / 1024:.1f} KB")
 
 
 async def run():
-    """Run all scrapers and upsert to DB."""
+    """Run all scrapers concurrently and upsert each provider as soon as it finishes."""
     if not os.getenv("DATABASE_URL"):
         print("ERROR: DATABASE_URL not set")
         sys.exit(1)
 
-    total_models = 0
-    for ScraperClass in SCRAPERS:
-        scraper = ScraperClass()
-        try:
-            provider, models = await scraper.scrape()
-            await upsert_provider(provider)
-            for m in models:
-                await upsert_model(m)
-                total_models += 1
-            print(f"  {scraper.provider_id}: {len(models)} models")
-        except Exception as e:
-            print(f"  {scraper.provider_id}: ERROR - {e}")
+    started = time.perf_counter()
+    # HTML parsing is CPU-bound: run scrapers' parse() in worker processes, off the event loop.
+    enable_parse_pool()
+    try:
+        semaphore = asyncio.Semaphore(max(1, SCRAPE_CONCURRENCY))
+        tasks = [asyncio.create_task(_scrape(S, semaphore, SCRAPE_TIMEOUT_SECONDS)) for S in SCRAPERS]
+
+        totals = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+        any_changes = False
+        written = []
+        for next_done in asyncio.as_completed(tasks):
+            scraper, result, error, seconds = await next_done
+            provider_id = scraper.provider_id
+            if error:
+                print(f"  {provider_id}: ERROR - {error}")
+                continue
+            if result is None:
+                print(f"  {provider_id}: unchanged (304), skipped")
+                continue
+            provider, models = result
+            try:
+                # One transaction per provider; only rows whose content hash changed are written.
+                stats = await upsert_provider_models(provider, models)
+                written.append(scraper)
+                any_changes = any_changes or stats.any_changes
+                for key in totals:
+                    totals[key] += getattr(stats, key)
+                print(
+                    f"  {provider_id}: {len(models)} models — +{stats.added} added, ~{stats.changed} changed, "
+                    f"-{stats.removed} removed, ={stats.unchanged} unchanged ({seconds:.2f}s)"
+                )
+            except Exception as e:
+                print(f"  {provider_id}: ERROR - {e}")
+
+        # Publish everything written this run (or left unpublished by a failed one) in one step.
+        if await refresh_catalog_view(force=any_changes):
+            print("  catalog_view refreshed, API notified")
+        # Only now are the pages' ETag / Last-Modified cached: a run that fails to publish must refetch them.
+        for scraper in written:
+            scraper.commit_fetches()
 
-    await close_pool()
-    print(f"Scrape completed: {total_models} models upserted")
+        if CATALOG_SNAPSHOT_PATH:
+            await write_catalog_snapshot(CATALOG_SNAPSHOT_PATH)
+    finally:
+        await close_http_client()
+        close_parse_executor()
+        await close_pool()
+    print(
+        f"Scrape completed in {time.perf_counter() - started:.2f}s: "
+        f"{totals['added']} added, {totals['changed']} changed, "
+        f"{totals['removed']} removed, {totals['unchanged']} unchanged"
+    )
 
 
 if __name__ == "__main__":